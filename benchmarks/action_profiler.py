@@ -0,0 +1,53 @@
+import statistics
+import time
+
+from common.task.exceptions import TaskError
+from client.task.ActionProfiler import PROFILER
+from client.task.Task import Task
+from client.task.TaskSession import TaskSession
+
+POINTS = 20000
+REPEAT = 5
+
+
+def _session() -> TaskSession:
+    ts = TaskSession(Task('0.5x+1', (0., 10.), 100, 0.05, 0.95))
+    ts.start()
+    ts.set_int_x((0., 10.))
+    ts.set_int_y((0., 6.))
+    ts.next_step()
+    return ts
+
+
+def _run(enabled: bool) -> float:
+    """
+    :return: Time per generated and counted point, every tenth count wrong.
+    """
+    PROFILER.enabled = enabled
+    PROFILER.reset()
+    ts = _session()
+    f = ts.task.f
+    points = [(i % 100 / 10, i % 60 / 10) for i in range(POINTS)]
+    start = time.perf_counter()
+    for i, p in enumerate(points):
+        ts.generate_point(p)
+        hit = p[1] <= f(p[0])
+        try:
+            ts.count_point(hit if i % 10 else not hit)
+        except TaskError:
+            ts.count_point(hit)
+    elapsed = time.perf_counter() - start
+    PROFILER.enabled = False
+    return elapsed / POINTS
+
+
+def bench_profiler():
+    print(f"TaskSession generate and count of {POINTS} points, median over {REPEAT} runs")
+    print(f"{'profiler':>9} {'us per point':>13} {'histograms':>11}")
+    for enabled in (False, True):
+        per_point = statistics.median(_run(enabled) for _ in range(REPEAT))
+        print(f"{'on' if enabled else 'off':>9} {per_point * 1e6:>13.2f} {len(PROFILER.histograms):>11}")
+
+
+if __name__ == '__main__':
+    bench_profiler()
@@ -0,0 +1,133 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from common.task.const import STEP, ACTION, ERROR
+from common.task.data import TaskState, TaskStats
+from common.task.store import StatsStoreWriter, session_columns
+from common.task import query
+
+SIZES = (10_000, 100_000, 300_000)
+TEMPLATES = 64
+TASKS = ('x^2', 'sin(x) + 1', '0.5x+1', 'exp(-x^2)')
+NAMES = 500
+
+
+def _session(rnd: random.Random) -> tuple[TaskState, TaskStats, np.ndarray]:
+    """
+    :return: Session of a student passing every step with occasional mistakes, and its event times.
+    Completing action of a step is recorded with the next step, as TaskSession does.
+    """
+    state = TaskState()
+    stats = TaskStats(state)
+
+    def act(action: ACTION, error: ERROR, args: tuple = (0.,)):
+        if rnd.random() < 0.2:
+            stats.append_error(error, args, action=action)
+        stats.append_action(action, args)
+
+    state.step = STEP.RECT
+    stats.append_action(ACTION.START)
+    act(ACTION.X_0 | ACTION.X_1, ERROR.X_1, ((0., 10.),))
+    act(ACTION.Y_0 | ACTION.Y_1, ERROR.Y_1, ((0., 10.),))
+    state.step = STEP.POINTS
+    stats.append_action(ACTION.RECT_COMPLETE)
+    for _ in range(rnd.randrange(100, 200)):
+        hit = rnd.random() < 0.5
+        state.point_buffer.append((rnd.uniform(0, 10), rnd.uniform(0, 10)))
+        stats.append_action(ACTION.GENERATE, (tuple(state.points[-1].tolist()),))
+        if rnd.random() < 0.05:
+            stats.append_error(ERROR.COUNT | (ERROR.COUNT_HIT if hit else ERROR.COUNT_MISS), (not hit,),
+                               action=ACTION.COUNT)
+        state.point_buffer.count(hit)
+        stats.append_action(ACTION.COUNT, (hit,))
+    state.step = STEP.INTEGRAL
+    stats.append_action(ACTION.POINTS_COMPLETE)
+    act(ACTION.RESULT, ERROR.RESULT)
+    state.step = STEP.ERROR
+    stats.append_action(ACTION.INTEGRAL_COMPLETE)
+    act(ACTION.ERROR, ERROR.ERROR)
+    state.step = STEP.END
+    stats.append_action(ACTION.ERROR_COMPLETE | ACTION.END)
+    state.result, state.error = 10., 100
+    return state, stats, np.cumsum([rnd.uniform(0.5, 3) for _ in range(stats.records)])
+
+
+def _sessions(n: int) -> list[tuple[str, tuple, TaskState, TaskStats, np.ndarray]]:
+    """
+    :return: Sessions sharing a few distinct state and stats objects, per session query cost does not depend on that.
+    """
+    rnd = random.Random(0)
+    templates = [_session(rnd) for _ in range(TEMPLATES)]
+    res = []
+    for i in range(n):
+        f = TASKS[i % len(TASKS)]
+        res.append((f'student{rnd.randrange(NAMES)}', (f, 0., 10., 100, 0.05, 0.95), *templates[i % TEMPLATES]))
+    return res
+
+
+def _query_objects(sessions) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+    """
+    Error counts per code and mean step durations per task, walking session objects one at a time.
+    """
+    errors = {}
+    durations = {}
+    for name, task, state, stats, times in sessions:
+        counts = errors.setdefault(task[0], np.zeros(len(ERROR), dtype=np.int64))
+        for step_errors in stats.errors.values():
+            for e in step_errors:
+                for i, code in enumerate(ERROR):
+                    if code in e.code:
+                        counts[i] += 1
+        step_time = {}
+        for step, actions in stats.actions.items():
+            step_time[step] = times[actions[0].index]
+        for step, step_errors in stats.errors.items():
+            step_time[step] = min(step_time.get(step, np.inf), times[step_errors[0].index])
+        d = durations.setdefault(task[0], [np.zeros(len(query.DURATION_STEPS)), 0])
+        d[0] += [step_time[STEP(s + 1)] - step_time[s] for s in query.DURATION_STEPS]
+        d[1] += 1
+    return errors, {k: total / count for k, (total, count) in durations.items()}
+
+
+def _query_store(path: str) -> tuple[query.Groups, query.Groups]:
+    table = query.load_store(path, columns=('task_f', 'error_counts', 'step_time'))
+    return query.error_counts(table, 'task_f'), query.step_durations(table, 'task_f')
+
+
+def bench_analytics():
+    print("Error counts per code and mean step time per task: objects walked one at a time vs columnar store")
+    print(f"{'sessions':>9} {'objects s':>10} {'export s':>9} {'store MB':>9} {'query s':>8}")
+    for n in SIZES:
+        sessions = _sessions(n)
+        start = time.perf_counter()
+        errors, durations = _query_objects(sessions)
+        objects_time = time.perf_counter() - start
+
+        path = tempfile.mkdtemp(prefix='mct_store_')
+        try:
+            start = time.perf_counter()
+            with StatsStoreWriter(path) as writer:
+                for name, task, state, stats, times in sessions:
+                    writer.append_columns(session_columns(name, task, state, stats, times))
+            export_time = time.perf_counter() - start
+            size = sum(f.stat().st_size for f in os.scandir(path))
+
+            start = time.perf_counter()
+            error_groups, duration_groups = _query_store(path)
+            query_time = time.perf_counter() - start
+        finally:
+            shutil.rmtree(path)
+
+        for i, f in enumerate(error_groups.keys[0]):
+            assert np.array_equal(errors[f], error_groups.values[i])
+            assert np.allclose(durations[f], duration_groups.values[i])
+        print(f"{n:>9} {objects_time:>10.2f} {export_time:>9.2f} {size / 2 ** 20:>9.1f} {query_time:>8.3f}")
+
+
+if __name__ == '__main__':
+    bench_analytics()
@@ -0,0 +1,93 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CALLS = 5000
+# GUI thread logs between events rather than in a tight loop, which would only measure GIL contention with listener.
+INTERVAL = 0.0005
+RESULT = 'result'
+PIPELINES = ('blocking', 'queue', 'queue-json')
+
+
+def _env() -> dict[str, str]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (root, env.get('PYTHONPATH'))))
+    return env
+
+
+def _configure_blocking():
+    """
+    Logging as configured before the queue pipeline, file and console written by the calling thread.
+    """
+    import logging
+
+    formatter = logging.Formatter('%(levelname)s:%(name)s: %(asctime)s : %(message)s')
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+    file_handler = logging.FileHandler('MonteCarloTrainer.log')
+    file_handler.setFormatter(formatter)
+    logging.getLogger().addHandler(stream_handler)
+    logging.getLogger().addHandler(file_handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+
+def _run_pipeline(name: str):
+    """
+    Run in a child process with a temporary working directory, prints per call latencies of the calling thread.
+    """
+    import logging
+    import time
+
+    if name == 'blocking':
+        _configure_blocking()
+    else:
+        from common.utils import STATE
+        STATE.LOG_JSON = name == 'queue-json'
+        import common.log
+
+    log = logging.getLogger('client.app')
+    times = []
+    for i in range(CALLS):
+        start = time.perf_counter_ns()
+        log.info("Event %d of %s", i, name)
+        times.append(time.perf_counter_ns() - start)
+        time.sleep(INTERVAL)
+    start = time.perf_counter()
+    logging.shutdown() if name == 'blocking' else common.log.stop_logging()
+    flushed = time.perf_counter() - start
+    lines = 0
+    for e in os.scandir('.'):
+        with open(e.path, mode='rb') as f:
+            lines += sum(1 for _ in f)
+    print(RESULT, json.dumps({'times': times, 'flushed': flushed, 'lines': lines}), flush=True)
+
+
+def bench_pipeline(name: str) -> dict:
+    with tempfile.TemporaryDirectory(prefix='mct_log_') as cwd:
+        proc = subprocess.run([sys.executable, '-c', f"from benchmarks.logging_latency import _run_pipeline;"
+                                                     f" _run_pipeline({name!r})"],
+                              cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=_env())
+    if proc.returncode:
+        raise RuntimeError(f"Logging pipeline \"{name}\" child process failed with code {proc.returncode}.")
+    line = next(line for line in proc.stdout.splitlines() if line.startswith(RESULT))
+    return json.loads(line[len(RESULT):])
+
+
+def bench_logging():
+    print(f"Logging call latency on the calling thread over {CALLS} calls {INTERVAL * 1e3:g} ms apart,"
+          f" console redirected to /dev/null")
+    print(f"{'pipeline':>11} {'median us':>10} {'p99 us':>8} {'max us':>8} {'total ms':>9} {'flush ms':>9}"
+          f" {'lines':>6}")
+    for name in PIPELINES:
+        res = bench_pipeline(name)
+        times = sorted(res['times'])
+        print(f"{name:>11} {statistics.median(times) / 1e3:>10.1f} {times[int(len(times) * 0.99)] / 1e3:>8.1f}"
+              f" {times[-1] / 1e3:>8.1f} {sum(times) / 1e6:>9.1f} {res['flushed'] * 1e3:>9.1f} {res['lines']:>6}")
+
+
+if __name__ == '__main__':
+    bench_logging()
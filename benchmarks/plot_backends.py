@@ -0,0 +1,131 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPEAT = 3
+TASK = ('sin(x) + x^2 / 10', (0, 10), 100, 0.05, 0.95)
+POINTS = 500
+SETTLE_MS = 1000
+RESULT = 'result'
+
+
+def _env() -> dict[str, str]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (root, env.get('PYTHONPATH'))))
+    return env
+
+
+def _children() -> dict[int, list[int]]:
+    children = {}
+    for name in os.listdir('/proc'):
+        if name.isdigit():
+            try:
+                with open(f'/proc/{name}/stat', mode='r') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def tree_rss(pid: int) -> int | None:
+    """
+    :return: Resident set size in bytes of process and all its descendants, None if /proc is unavailable.
+    """
+    if not os.path.isdir('/proc'):
+        return None
+    children = _children()
+    total = 0
+    stack = [pid]
+    while stack:
+        p = stack.pop()
+        stack.extend(children.get(p, ()))
+        try:
+            with open(f'/proc/{p}/status', mode='r') as f:
+                total += next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmRSS:'))
+        except (OSError, StopIteration):
+            pass
+    return total
+
+
+def _run_backend(name: str):
+    """
+    Run in a child process, prints timings and memory after plotting a task.
+    """
+    import random
+
+    start = time.perf_counter()
+    from PySide6.QtCore import QEventLoop, Qt, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    from client.task.Task import Task
+    from client.gui.plot.PlotBackend import create_plot_backend
+
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    app = QApplication([])
+    backend = create_plot_backend(name)
+    backend.widget.resize(800, 600)
+    backend.widget.show()
+    if not backend.is_loaded:
+        loop = QEventLoop()
+        backend.loaded.connect(loop.quit)
+        loop.exec()
+    loaded = time.perf_counter()
+
+    task = Task(*TASK)
+    points = [(random.uniform(0, 10), random.uniform(0, 11)) for _ in range(POINTS)]
+    plot_start = time.perf_counter()
+    backend.set_task(task)
+    backend.set_rect(0, 10, 0, 11)
+    backend.set_rect_fill(True)
+    backend.set_points(points)
+    backend.select_point(len(points) - 1)
+    backend.update_plot()
+    app.processEvents()
+    plotted = time.perf_counter()
+
+    QTimer.singleShot(SETTLE_MS, app.quit)
+    app.exec()
+    print(RESULT, json.dumps({'loaded': loaded - start, 'plot': plotted - plot_start, 'rss': tree_rss(os.getpid())}),
+          flush=True)
+
+
+def bench_backend(name: str, repeat: int = REPEAT) -> list[dict]:
+    results = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-m', 'benchmarks.plot_backends', '--child', name],
+                              capture_output=True, text=True, env=_env())
+        if proc.returncode:
+            raise RuntimeError(f"Backend \"{name}\" child process failed:\n{proc.stderr.strip().splitlines()[-1]}")
+        line = next(line for line in proc.stdout.splitlines() if line.startswith(RESULT))
+        results.append(json.loads(line[len(RESULT):]))
+    return results
+
+
+def bench_backends():
+    from client.utils import CONST
+
+    print(f"Plot backends, median over {REPEAT} runs, settled {SETTLE_MS} ms after plotting")
+    print(f"{'backend':>8} {'loaded ms':>10} {'plot ms':>10} {'RSS MB':>8}")
+    for name in CONST.PLOT_BACKENDS:
+        try:
+            results = bench_backend(name)
+        except RuntimeError as error:
+            print(f"{name:>8} skipped: {error}")
+            continue
+        loaded = statistics.median(r['loaded'] for r in results) * 1e3
+        plot = statistics.median(r['plot'] for r in results) * 1e3
+        rss = [r['rss'] for r in results if r['rss'] is not None]
+        rss = f"{statistics.median(rss) / 2 ** 20:.1f}" if rss else 'n/a'
+        print(f"{name:>8} {loaded:>10.1f} {plot:>10.1f} {rss:>8}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        _run_backend(sys.argv[2])
+    else:
+        bench_backends()
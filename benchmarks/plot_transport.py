@@ -0,0 +1,89 @@
+import json
+import sys
+import time
+import timeit
+
+import numpy as np
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 5
+
+
+def _data(n: int) -> tuple[np.ndarray, np.ndarray]:
+    xs = np.linspace(-1, 1, n)
+    return xs, np.sin(xs * 10)
+
+
+def bench_encode():
+    from client.gui.plot.encoding import encode_float64
+
+    print("Python-side encoding, ms per call")
+    print(f"{'points':>8} {'json':>10} {'base64':>10}")
+    for n in SIZES:
+        xs, ys = _data(n)
+        t_json = min(timeit.repeat(
+            lambda: f"setFunctionPlot({json.dumps(list(map(float, xs)))}, {json.dumps(list(map(float, ys)))})",
+            number=1, repeat=REPEAT))
+        t_b64 = min(timeit.repeat(lambda: (encode_float64(xs), encode_float64(ys)), number=1, repeat=REPEAT))
+        print(f"{n:>8} {t_json * 1e3:>10.3f} {t_b64 * 1e3:>10.3f}")
+
+
+def bench_page():
+    from PySide6.QtCore import QEventLoop, QTimer
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtWebEngineWidgets import QWebEngineView
+
+    from client.gui.plot.PlotController import PlotPage
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    def wait(page: PlotPage, n: int):
+        loop = QEventLoop()
+
+        def poll():
+            page.runJavaScript("document.getElementById('plot').data[0].x.length", 0, check)
+
+        def check(length):
+            if length == n:
+                loop.quit()
+            else:
+                QTimer.singleShot(0, poll)
+
+        poll()
+        loop.exec()
+
+    results = {}
+    for channel in (False, True):
+        view = QWebEngineView()
+        page = PlotPage(None, channel=channel)
+        view.setPage(page)
+        loop = QEventLoop()
+        page.ready.connect(loop.quit)
+        loop.exec()
+        for n in SIZES:
+            xs, ys = _data(n)
+            times = []
+            for _ in range(REPEAT):
+                page.reset_data()
+                wait(page, 0)
+                start = time.perf_counter()
+                page.set_function_plot(xs, ys)
+                wait(page, n)
+                times.append(time.perf_counter() - start)
+            results[channel, n] = min(times)
+        view.close()
+
+    print("Python to plot.js round trip, ms per update")
+    print(f"{'points':>8} {'script':>10} {'channel':>10}")
+    for n in SIZES:
+        print(f"{n:>8} {results[False, n] * 1e3:>10.3f} {results[True, n] * 1e3:>10.3f}")
+
+
+if __name__ == '__main__':
+    bench_encode()
+    try:
+        import PySide6.QtWebEngineWidgets
+    except ImportError as error:
+        print(f"QtWebEngine is unavailable, skipping page round trip: {error}")
+    else:
+        bench_page()
@@ -0,0 +1,113 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULE = 'client.gui.MainWindow'
+HEAVY = ('sympy', 'scipy', 'scipy.optimize', 'scipy.special', 'PySide6.QtWebEngineWidgets', 'PySide6.QtWebEngineCore')
+REPEAT = 5
+TOP = 10
+PAINTED = 'painted'
+
+
+def _env() -> dict[str, str]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (root, env.get('PYTHONPATH'))))
+    return env
+
+
+def import_times(module: str = MODULE) -> dict[str, tuple[int, int, int]]:
+    """
+    :return: Module name to (self us, cumulative us, nesting depth) as reported by `-X importtime`.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          capture_output=True, text=True, env=_env())
+    if proc.returncode:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr.splitlines()[-1]}")
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return times
+
+
+def bench_import(module: str = MODULE):
+    times = import_times(module)
+    print(f"-X importtime of {module}, ms")
+    print(f"{'total':>28} {times[module][1] / 1e3:>10.1f}")
+    for name in HEAVY:
+        print(f"{name:>28} {times[name][1] / 1e3 if name in times else 'not loaded':>10}")
+    print(f"Top {TOP} slowest direct imports:")
+    direct = sorted((t[1], name) for name, t in times.items() if t[2] == 1)
+    for cumulative, name in reversed(direct[-TOP:]):
+        print(f"{name:>28} {cumulative / 1e3:>10.1f}")
+
+
+def _first_paint():
+    """
+    Run in a child process, prints marker on the first paint of the main window.
+    """
+    start = time.perf_counter()
+    from PySide6.QtCore import QEvent, QObject, Qt
+    from PySide6.QtWidgets import QApplication
+
+    from client.gui.MainWindow import MainWindow
+
+    imported = time.perf_counter()
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    app = QApplication([])
+
+    class PaintFilter(QObject):
+
+        def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+            if event.type() == QEvent.Type.Paint:
+                app.removeEventFilter(self)
+                print(PAINTED, imported - start, time.perf_counter() - start, flush=True)
+                app.exit()
+            return False
+
+    paint_filter = PaintFilter()
+    app.installEventFilter(paint_filter)
+    mw = MainWindow()
+    mw.show()
+    app.exec()
+
+
+def bench_first_paint(repeat: int = REPEAT):
+    from client.gui.ui_utils import compile_ui
+    compile_ui()
+
+    totals, imports, paints = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, '-m', 'benchmarks.startup', '--child'],
+                                stdout=subprocess.PIPE, text=True, env=_env())
+        for line in proc.stdout:
+            if line.startswith(PAINTED):
+                totals.append(time.perf_counter() - start)
+                _, t_import, t_paint = line.split()
+                imports.append(float(t_import))
+                paints.append(float(t_paint))
+                break
+        proc.stdout.close()
+        proc.wait()
+        if proc.returncode:
+            raise RuntimeError(f"First paint child process failed with code {proc.returncode}.")
+
+    print(f"Wall clock to first paint under offscreen QPA, ms over {repeat} runs")
+    print(f"{'':>28} {'min':>10} {'median':>10}")
+    for name, values in (('process spawn to paint', totals), ('imports', imports), ('script start to paint', paints)):
+        print(f"{name:>28} {min(values) * 1e3:>10.1f} {statistics.median(values) * 1e3:>10.1f}")
+
+
+if __name__ == '__main__':
+    if '--child' in sys.argv[1:]:
+        _first_paint()
+    else:
+        bench_import()
+        bench_first_paint()
@@ -0,0 +1,208 @@
+import hashlib
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROWS = 20000
+LATENCY = 0.3
+CHUNK = 64 * 1024
+CHUNK_DELAY = 0.02
+REPEAT = 5
+TIMEOUT = 10
+SHEET_LATENCIES = (0.2, 0.4, 0.6, 0.8)
+SHEET_OVERLAP = 100
+
+
+def _batch(rows: int, seed: int = 0, first: int = 0) -> bytes:
+    return ''.join(f"Student {i},x^2 + {seed},0,{i % 10 + 1},100,0.05,0.95\n"
+                   for i in range(first, first + rows)).encode('utf-8')
+
+
+class Sheet:
+
+    def __init__(self, content: bytes, latency: float):
+        self.latency = latency
+        self.set_content(content)
+
+    def set_content(self, content: bytes):
+        self.content = content
+        self.etag = f'"{hashlib.sha1(content).hexdigest()}"'
+        self.last_modified = formatdate(usegmt=True)
+
+
+class TaskServer(ThreadingHTTPServer):
+    """
+    Local stand-in of spreadsheet export of several sheets, answering conditional requests with 304
+    after simulated latency and sending content in chunks over a slow link.
+    """
+    daemon_threads = True
+
+    def __init__(self, latency: float = LATENCY):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.responses = {200: 0, 304: 0}
+        self.sheets = {'0': Sheet(_batch(ROWS), latency)}
+
+    def set_content(self, content: bytes, sheet: str = '0'):
+        self.sheets[sheet].set_content(content)
+
+    def url(self, sheet: str = '0') -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{sheet}/export?format=csv"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: TaskServer
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        sheet = self.server.sheets.get(self.path.split('/')[1])
+        if sheet is None:
+            self.send_error(404)
+            return
+        time.sleep(sheet.latency)
+        if self.headers.get('If-None-Match') == sheet.etag:
+            self.send_response(304)
+            self.send_header('ETag', sheet.etag)
+            self.end_headers()
+            self.server.responses[304] += 1
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv; charset=utf-8')
+        self.send_header('Content-Length', str(len(sheet.content)))
+        self.send_header('ETag', sheet.etag)
+        self.send_header('Last-Modified', sheet.last_modified)
+        self.end_headers()
+        content = sheet.content
+        for i in range(0, len(content), CHUNK):
+            self.wfile.write(content[i:i + CHUNK])
+            self.wfile.flush()
+            time.sleep(CHUNK_DELAY)
+        self.server.responses[200] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _wait(app, predicate, timeout: float = TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Download did not finish in time.")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def _load(app, cache_dir: str, url: str | list[str], trace: bool = False) \
+        -> tuple[float, float, float, int, int, bool, int]:
+    """
+    :return: Time until first rows are published, time until batch is complete, time until update request is finished,
+        batch rows, number of times batch was published, whether update failed and peak traced memory if traced.
+    """
+    from client.gui.TaskDownloader import TaskDownloader
+    from client.task.DownloadCache import DownloadCache
+
+    downloader = TaskDownloader(DownloadCache(cache_dir))
+    downloader.set_urls(url if isinstance(url, list) else [url])
+    events = []
+    downloader.rows_received.connect(lambda rows: events.append(('rows', time.perf_counter())) if rows else None)
+    downloader.updated.connect(lambda: events.append(('updated', time.perf_counter())))
+    downloader.failed.connect(lambda m: events.append(('failed', time.perf_counter())))
+    downloader.finished.connect(lambda: events.append(('finished', time.perf_counter())))
+
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    downloader.update_tasks()
+    _wait(app, lambda: any(e == 'finished' for e, _ in events))
+    finished = time.perf_counter()
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    first_rows = next(t for e, t in events if e == 'rows')
+    complete = next(t for e, t in events if e == 'updated')
+    return first_rows - start, complete - start, finished - start, len(downloader.task_batch), \
+        sum(e == 'updated' for e, _ in events), any(e == 'failed' for e, _ in events) or downloader.errors.has_errors(), \
+        peak
+
+
+def _scenario(app, trace: bool = False) -> dict[str, tuple]:
+    """
+    Loads batch with empty cache, with cache of the same batch, after batch changes and with server down.
+    """
+    server = TaskServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache_dir = tempfile.mkdtemp(prefix='mct_downloads_')
+    try:
+        res = {'cold': _load(app, cache_dir, server.url(), trace), 'warm': _load(app, cache_dir, server.url(), trace)}
+        server.set_content(_batch(ROWS, seed=1))
+        res['changed'] = _load(app, cache_dir, server.url(), trace)
+        server.shutdown()
+        server.server_close()
+        res['offline'] = _load(app, cache_dir, server.url(), trace)
+        assert server.responses == {200: 2, 304: 1}, server.responses
+        return res
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def _load_cold(app, url: str | list[str]) -> tuple[float, float, float, int, int, bool, int]:
+    with tempfile.TemporaryDirectory(prefix='mct_downloads_') as cache_dir:
+        return _load(app, cache_dir, url)
+
+
+def bench_sources():
+    """
+    Loads sheets of different latency one by one and all together, sheets share some students.
+    """
+    from PySide6.QtCore import QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    server = TaskServer()
+    rows = ROWS // len(SHEET_LATENCIES)
+    for i, latency in enumerate(SHEET_LATENCIES):
+        server.sheets[str(i)] = Sheet(_batch(rows + SHEET_OVERLAP, first=i * rows), latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [server.url(str(i)) for i in range(len(SHEET_LATENCIES))]
+    single, merged = [], []
+    try:
+        for _ in range(REPEAT):
+            single.append(sum(_load_cold(app, url)[1] for url in urls))
+            merged.append(_load_cold(app, urls))
+        missing = _load_cold(app, urls + [server.url('missing')])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"{len(urls)} sheets of {rows + SHEET_OVERLAP} rows with {', '.join(f'{t * 1e3:.0f}' for t in SHEET_LATENCIES)}"
+          f" ms latency, median over {REPEAT} runs")
+    print(f"{'one by one ms':>14} {'concurrent ms':>14} {'rows':>6} {'with missing sheet':>19}")
+    print(f"{statistics.median(single) * 1e3:>14.1f} {statistics.median(r[1] for r in merged) * 1e3:>14.1f}"
+          f" {merged[0][3]:>6} {f'{missing[3]} rows, failed' if missing[5] else 'not reported':>19}")
+
+
+def bench_download():
+    from PySide6.QtCore import QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    runs = [_scenario(app) for _ in range(REPEAT)]
+    traced = _scenario(app, trace=True)
+
+    print(f"Tasks download of {ROWS} rows ({len(_batch(ROWS)) / 2 ** 20:.1f} MB), {LATENCY * 1e3:.0f} ms server latency,"
+          f" {CHUNK // 1024} KB per {CHUNK_DELAY * 1e3:.0f} ms, median over {REPEAT} runs")
+    print(f"{'load':>8} {'first rows ms':>14} {'complete ms':>12} {'finished ms':>12} {'rows':>6} {'updates':>8}"
+          f" {'failed':>7} {'peak MB':>8}")
+    for name in traced:
+        first_rows, complete, finished = (statistics.median(r[name][i] for r in runs) for i in range(3))
+        _, _, _, rows, updates, failed, peak = traced[name]
+        print(f"{name:>8} {first_rows * 1e3:>14.1f} {complete * 1e3:>12.1f} {finished * 1e3:>12.1f} {rows:>6}"
+              f" {updates:>8} {failed!s:>7} {peak / 2 ** 20:>8.1f}")
+
+
+if __name__ == '__main__':
+    bench_download()
+    bench_sources()
@@ -0,0 +1,104 @@
+import dataclasses
+import random
+import time
+import timeit
+import tracemalloc
+
+from common.task.const import STEP, ACTION, ERROR
+from common.task.data import TaskState, TaskStats
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 5
+
+
+@dataclasses.dataclass
+class LegacyEvent:
+    """
+    Per event record as TaskStats stored it before the columnar event log.
+    """
+    action: ACTION
+    time: float
+    args: tuple
+    kwargs: dict
+    index: int
+
+
+class LegacyStats:
+
+    def __init__(self):
+        self.records = 0
+        self.actions: dict[STEP, list[LegacyEvent]] = {}
+        self.errors: dict[STEP, list[LegacyEvent]] = {}
+
+    def append(self, action: ACTION, error: ERROR | None, args: tuple):
+        events = self.errors if error is not None else self.actions
+        events.setdefault(STEP.POINTS, []).append(LegacyEvent(action, time.time(), args, {}, self.records))
+        self.records += 1
+
+    def error_count(self) -> int:
+        return sum(map(len, self.errors.values()))
+
+
+def _events(n: int) -> list[tuple[ACTION, ERROR | None, tuple]]:
+    """
+    :return: Events of a long POINTS step, alternating generated points and their counts with occasional errors.
+    """
+    rnd = random.Random(0)
+    events = []
+    for i in range(n):
+        if i % 2 == 0:
+            events.append((ACTION.GENERATE, None, ((rnd.uniform(0, 10), rnd.uniform(0, 10)),)))
+        else:
+            events.append((ACTION.COUNT, ERROR.COUNT if rnd.random() < 0.05 else None, (rnd.random() < 0.5,)))
+    return events
+
+
+def _fill_legacy(events) -> LegacyStats:
+    stats = LegacyStats()
+    for action, error, args in events:
+        stats.append(action, error, args)
+    return stats
+
+
+def _fill_columnar(events) -> TaskStats:
+    state = TaskState()
+    state.step = STEP.POINTS
+    stats = TaskStats(state)
+    for action, error, args in events:
+        if error is None:
+            stats.append_action(action, args)
+        else:
+            stats.append_error(error, args, action=action)
+    return stats
+
+
+def _measure(fill, events) -> tuple[object, int, float]:
+    start = time.perf_counter()
+    fill(events)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    stats = fill(events)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return stats, size, elapsed
+
+
+def bench_stats():
+    print("Event log of POINTS step: retained memory, fill time and error count query")
+    print(f"{'events':>8} {'legacy KB':>10} {'columnar KB':>12} {'legacy ms':>10} {'columnar ms':>12}"
+          f" {'legacy count us':>16} {'columnar count us':>18}")
+    for n in SIZES:
+        events = _events(n)
+        # Event arguments are shared by both representations, so only stores are measured.
+        legacy, legacy_size, legacy_time = _measure(_fill_legacy, events)
+        columnar, columnar_size, columnar_time = _measure(_fill_columnar, events)
+        legacy_count = min(timeit.repeat(legacy.error_count, number=100, repeat=REPEAT)) / 100
+        columnar_count = min(timeit.repeat(columnar.error_count, number=100, repeat=REPEAT)) / 100
+        assert legacy.error_count() == columnar.error_count()
+        print(f"{n:>8} {legacy_size / 1024:>10.1f} {columnar_size / 1024:>12.1f}"
+              f" {legacy_time * 1e3:>10.1f} {columnar_time * 1e3:>12.1f}"
+              f" {legacy_count * 1e6:>16.2f} {columnar_count * 1e6:>18.2f}")
+
+
+if __name__ == '__main__':
+    bench_stats()
@@ -0,0 +1,154 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from common.exceptions import AppError
+from common.TaskBatch import BatchTaskTuple, open_task_batch, read_task_batch
+from common.task.const import STEP
+from common.task.record import SessionRecord, read_record, stats_entries
+from common.task.store import StatsStoreWriter, session_columns
+
+from client.task.Task import Task
+from client.task.TaskSession import TaskSession
+
+GRADE_STEPS = (STEP.RECT, STEP.POINTS, STEP.INTEGRAL, STEP.ERROR)
+GRADE_FIELDS = ('file', 'name', 'step', 'complete', *(f'errors_{s.name}' for s in GRADE_STEPS), 'errors',
+                'consistent', 'message')
+
+_batch: dict[str, BatchTaskTuple] = {}
+_export = False
+
+
+def replay_record(record: SessionRecord, task: Task) -> TaskSession:
+    session = TaskSession(task)
+    for entry in record.entries:
+        session.replay(entry.action, entry.args, entry.kwargs)
+    return session
+
+
+def grade_record(record: SessionRecord, task: Task) -> dict:
+    return grade_session(record, replay_record(record, task))
+
+
+def grade_session(record: SessionRecord, session: TaskSession) -> dict:
+    stats = session.stats
+    replayed = [(e.action, e.error) for e in stats_entries(stats)]
+    recorded = [(e.action, e.error) for e in record.entries]
+    grade = {
+        'name': record.name,
+        'step': session.step.name,
+        'complete': int(session.step is STEP.END),
+        'errors': stats.error_count(),
+        'consistent': int(replayed == recorded),
+    }
+    for s in GRADE_STEPS:
+        grade[f'errors_{s.name}'] = stats.error_count(s)
+    return grade
+
+
+def export_columns(record: SessionRecord, session: TaskSession, consistent: bool) -> dict[str, np.ndarray]:
+    """
+    :return: Store row of replayed session, with recorded event times if replay is consistent with record.
+    """
+    times = np.array([e.time for e in record.entries]) if consistent else None
+    return session_columns(record.name, record.task, session.state, session.stats, times)
+
+
+def _init_worker(batch: dict[str, BatchTaskTuple], export: bool = False):
+    global _batch, _export
+    _batch = batch
+    _export = export
+
+
+def grade_file(path: str) -> tuple[dict, dict[str, np.ndarray] | None]:
+    """
+    :return: Grade of record file and its store row if export is enabled and record is graded.
+    """
+    grade = {'file': path}
+    columns = None
+    try:
+        with open(path, mode='r', encoding='utf-8') as f:
+            record = read_record(f)
+        if record.name not in _batch:
+            raise AppError(f"Студент \"{record.name}\" не найден в файле с заданиями.")
+        row = _batch[record.name]
+        session = replay_record(record, Task(row[1], (row[2], row[3]), *row[4:]))
+        grade.update(grade_session(record, session))
+        if _export:
+            columns = export_columns(record, session, bool(grade['consistent']))
+    except Exception as error:
+        grade['message'] = f"{error.__class__.__name__}: {error}"
+    return grade, columns
+
+
+def grade(batch: list[BatchTaskTuple], paths: list[str], jobs: int | None = None,
+          store: str | None = None) -> list[dict]:
+    """
+    :param store: Directory of columnar statistics store to append graded sessions to.
+    """
+    batch = {row[0]: row for row in batch}
+    if jobs == 1:
+        _init_worker(batch, store is not None)
+        results = list(map(grade_file, paths))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(batch, store is not None)) \
+                as executor:
+            results = list(executor.map(grade_file, paths,
+                                        chunksize=max(1, len(paths) // (4 * (jobs or os.cpu_count())))))
+    if store is not None:
+        with StatsStoreWriter(store) as writer:
+            for _, columns in results:
+                if columns is not None:
+                    writer.append_columns(columns)
+    return [g for g, _ in results]
+
+
+def _record_paths(paths: list[str]) -> list[str]:
+    res = []
+    for p in paths:
+        if os.path.isdir(p):
+            res.extend(sorted(e.path for e in os.scandir(p) if e.is_file() and e.name.endswith('.jsonl')))
+        else:
+            res.append(p)
+    return res
+
+
+def run_cmd_grader(*args):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Replay recorded Monte Carlo method trainer sessions and grade them without GUI.',
+    )
+    parser.add_argument('batch', help='Tasks batch .csv or .csv.gz file.')
+    parser.add_argument('records', nargs='+', help='Session record .jsonl files or directories containing them.')
+    parser.add_argument('-d', '--delimiter', default=',', help='Tasks batch .csv file delimiter.')
+    parser.add_argument('-o', '--output', help='Output grades .csv file, stdout by default.')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of worker processes.')
+    parser.add_argument('-s', '--store', help='Statistics store directory to append graded sessions to.')
+
+    options = parser.parse_args(args)
+
+    with open_task_batch(options.batch) as f:
+        batch = read_task_batch(f, delimiter=options.delimiter)
+    grades = grade(batch, _record_paths(options.records), options.jobs, options.store)
+
+    if options.output is None:
+        import sys
+        _write_grades(sys.stdout, grades)
+    else:
+        with open(options.output, mode='w', encoding='utf-8', newline='') as f:
+            _write_grades(f, grades)
+
+
+def _write_grades(io, grades: list[dict]):
+    writer = csv.DictWriter(io, GRADE_FIELDS)
+    writer.writeheader()
+    writer.writerows(grades)
+
+
+if __name__ == '__main__':
+    import sys
+
+    run_cmd_grader(*sys.argv[1:])
@@ -1,17 +1,27 @@
 import os
+from typing import TYPE_CHECKING
 
-from PySide6.QtWidgets import QMainWindow, QStackedWidget
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QKeySequence, QShortcut, QShowEvent
+from PySide6.QtWidgets import QMainWindow, QMessageBox, QStackedWidget
 
 from common.exceptions import AppError
 
-from client.utils import CONST, PATH
+from client.utils import CONST, STATE, PATH
+from client.task.Task import Task
+from client.task.TaskJournal import TaskJournal
 
 from client.gui.TaskDownloader import TaskDownloader
 from client.gui.TaskChoiceWidget import TaskChoiceWidget
-from client.gui.TaskWidget import TaskWidget
+
+if TYPE_CHECKING:
+    from client.gui.TaskWidget import TaskWidget
+    from client.gui.ProfilerWidget import ProfilerWidget
 
 
 class MainWindow(QMainWindow):
+    PRELOAD_DELAY = 100
+    PROFILER_SHORTCUT = 'Ctrl+Shift+P'
 
     def __init__(self):
         super().__init__()
@@ -23,18 +33,67 @@ class MainWindow(QMainWindow):
         self.choice_widget = TaskChoiceWidget()
         self.stack.addWidget(self.choice_widget)
 
-        self.task_widget = TaskWidget()
-        self.stack.addWidget(self.task_widget)
+        # Task widget pulls QtWebEngine in, so it is created after the first paint.
+        self._task_widget: 'TaskWidget | None' = None
 
         self.stack.setCurrentWidget(self.choice_widget)
 
+        self._profiler_widget: 'ProfilerWidget | None' = None
+        if STATE.PROFILE:
+            QShortcut(QKeySequence(self.PROFILER_SHORTCUT), self).activated.connect(self.show_profiler)
+
         self._connect_ui()
 
+    @property
+    def task_widget(self) -> 'TaskWidget':
+        if self._task_widget is None:
+            from client.gui.TaskWidget import TaskWidget
+            self._task_widget = TaskWidget()
+            self.stack.addWidget(self._task_widget)
+        return self._task_widget
+
+    def show_profiler(self):
+        if self._profiler_widget is None:
+            from client.gui.ProfilerWidget import ProfilerWidget
+            self._profiler_widget = ProfilerWidget()
+            self._profiler_widget.resize(900, 400)
+        self._profiler_widget.show()
+        self._profiler_widget.activateWindow()
+
+    def showEvent(self, event: QShowEvent):
+        super().showEvent(event)
+        if self._task_widget is None:
+            QTimer.singleShot(self.PRELOAD_DELAY, lambda: self.task_widget)
+
     def _connect_ui(self):
         self.choice_widget.complete.connect(self.start_task)
+        self.choice_widget.batch_compiler.progress.connect(self._batch_progress)
+        self.choice_widget.batch_compiler.finished.connect(self.statusBar().clearMessage)
+
+    def _batch_progress(self, done: int, total: int):
+        self.statusBar().showMessage(f"Подготовка заданий: {done}/{total}")
 
     def start_task(self):
-        self.task_widget.set_task(self.choice_widget.task())
+        self.task_widget.set_task(self.choice_widget.task(), self.choice_widget.student_name())
+        self.stack.setCurrentWidget(self.task_widget)
+
+    def resume_task(self):
+        """
+        Offers to restore session interrupted by crash from its journal.
+        """
+        if not TaskJournal.exists(PATH.JOURNAL):
+            return
+        answer = QMessageBox.question(self, CONST.CLIENT_NAME, "Найдено незавершённое задание. Продолжить его?")
+        if answer != QMessageBox.StandardButton.Yes:
+            TaskJournal.discard(PATH.JOURNAL)
+            return
+        try:
+            content = TaskJournal.read(PATH.JOURNAL)
+            f, start, end, *args = content.task
+            self.task_widget.set_task(Task(f, (start, end), *args), content.name, resume=True)
+        except Exception:
+            TaskJournal.discard(PATH.JOURNAL)
+            raise
         self.stack.setCurrentWidget(self.task_widget)
 
 
@@ -44,16 +103,31 @@ class DownloaderMainWindow(MainWindow):
         super().__init__()
         # self.choice_widget.set_task_displayed(False)
         self._downloader = TaskDownloader()
+        self._downloader.started.connect(self.choice_widget.begin_task_batch)
+        self._downloader.rows_received.connect(self.choice_widget.extend_task_batch)
+        self._downloader.progress.connect(self.choice_widget.set_download_progress)
         self._downloader.updated.connect(self._downloaded)
+        self._downloader.finished.connect(self.choice_widget.viewDownload.hide)
+        self._downloader.failed.connect(self._download_failed)
 
     def load_key_path(self, p: str):
+        """
+        Loads tasks table ids, one per line, tables are merged in order of lines.
+        """
         if not os.path.isfile(p):
             raise AppError("Не удалось загрузить данные для получения таблицы заданий.")
         with open(p, mode='r') as f:
-            self._downloader.set_source(f.read().strip())
+            srcs = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+        if not srcs:
+            raise AppError(f"Файл \"{p}\" не содержит идентификаторов таблиц заданий.")
+        self._downloader.set_sources(srcs)
 
     def download(self):
         self._downloader.update_tasks()
 
     def _downloaded(self):
-        self.choice_widget.set_task_batch(self._downloader.task_batch)
+        self.choice_widget.finish_task_batch(self._downloader.errors)
+
+    def _download_failed(self, message: str):
+        self.choice_widget.viewDownload.hide()
+        self.statusBar().showMessage(f"Не удалось обновить задания, используется сохранённая копия: {message}")
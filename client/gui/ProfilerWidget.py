@@ -0,0 +1,80 @@
+import logging
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QWidget, QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout, QHBoxLayout, \
+    QPushButton, QFileDialog, QMessageBox
+
+from client.utils import PATH
+from client.task.ActionProfiler import ActionProfiler, PROFILER
+
+
+class ProfilerWidget(QWidget):
+    """
+    Debug panel of action time histograms, refreshed while shown.
+    """
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, profiler: ActionProfiler = PROFILER):
+        super().__init__()
+        self._profiler = profiler
+        self.setWindowTitle("Время выполнения действий")
+        self.setLayout(QVBoxLayout())
+
+        self.header_widget = QLabel(
+            "Время выполнения проверок, обработчиков интерфейса и обновления графика\n"
+            "столбцы корзин - число вызовов с временем не больше указанного")
+        self.layout().addWidget(self.header_widget)
+        self.table_widget = QTableWidget()
+        self.table_widget.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.layout().addWidget(self.table_widget)
+
+        buttons = QHBoxLayout()
+        self.buttonReset = QPushButton("Сбросить")
+        self.buttonExport = QPushButton("Экспорт CSV")
+        buttons.addStretch()
+        buttons.addWidget(self.buttonReset)
+        buttons.addWidget(self.buttonExport)
+        self.layout().addLayout(buttons)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_INTERVAL)
+        self._timer.timeout.connect(self.refresh)
+
+        self.buttonReset.clicked.connect(self._reset)
+        self.buttonExport.clicked.connect(self._export)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def refresh(self):
+        header, rows = self._profiler.header(), self._profiler.rows()
+        self.table_widget.setColumnCount(len(header))
+        self.table_widget.setHorizontalHeaderLabels(header)
+        self.table_widget.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                item = QTableWidgetItem(str(value))
+                if not isinstance(value, str):
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table_widget.setItem(i, j, item)
+        self.table_widget.resizeColumnsToContents()
+
+    def _reset(self):
+        self._profiler.reset()
+        self.refresh()
+
+    def _export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт времени выполнения", PATH.PROFILE, "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            self._profiler.save_csv(path)
+        except OSError as e:
+            logging.getLogger('client.app').exception(f"{self} failed exporting \"{path}\".")
+            QMessageBox.warning(self, self.windowTitle(), f"Не удалось сохранить \"{path}\": {e}")
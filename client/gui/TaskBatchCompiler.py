@@ -0,0 +1,84 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable
+
+from PySide6.QtCore import QObject, Signal
+
+from common import bounds
+from common.exceptions import AppError
+from common.TaskBatch import BatchTaskTuple
+
+from client.task.Task import Task
+from client.task.TaskSession import TaskSession
+from client.task.precompile import init_worker, precompile_task
+
+
+class TaskBatchCompiler(QObject):
+    progress = Signal(int, int)
+    finished = Signal()
+
+    _done = Signal(object, object, object)
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._executor: ProcessPoolExecutor | None = None
+        self._names: dict[tuple[str, tuple[float, float]], list[str]] = {}
+        self._completed = 0
+        self._errors: list[tuple[list[str], BaseException]] = []
+        self._done.connect(self._task_done)
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    def compile(self, task_batch: Iterable[BatchTaskTuple], dec: int = TaskSession.dec_accuracy):
+        self.cancel()
+        self._names = {}
+        for row in task_batch:
+            self._names.setdefault((' '.join(row[1].split()), (row[2], row[3])), []).append(row[0])
+        self._completed = 0
+        self._errors = []
+        if not self._names:
+            self.finished.emit()
+            return
+
+        # Forking a process running Qt event loop and threads is unsafe, workers are started fresh.
+        self._executor = ProcessPoolExecutor(max_workers=min(len(self._names), os.cpu_count() or 1),
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=init_worker,
+                                             initargs=(Task.disk_cache.root if Task.disk_cache is not None else None,))
+        for key in self._names:
+            future = self._executor.submit(precompile_task, *key, dec)
+            # Executor is bound at submit time, callback runs in executor thread after it may be replaced.
+            future.add_done_callback(lambda fut, k=key, ex=self._executor: self._done.emit(ex, k, fut))
+        self.progress.emit(0, len(self._names))
+
+    def cancel(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _task_done(self, executor: ProcessPoolExecutor, key: tuple[str, tuple[float, float]], future: Future):
+        if executor is not self._executor or future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self._errors.append((self._names[key], error))
+        elif future.result() is not None:
+            bounds.cache_bounds(*future.result())
+        self._completed += 1
+        self.progress.emit(self._completed, len(self._names))
+        if self._completed == len(self._names):
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            logging.getLogger('client.app').info(
+                f"{self.__class__.__name__} compiled {len(self._names)} tasks, {len(self._errors)} failed.")
+            self.finished.emit()
+            self.raise_for_errors()
+
+    def raise_for_errors(self):
+        if self._errors:
+            raise AppError("Не удалось подготовить задания:\n" + '\n'.join(
+                f"{', '.join(names)}: {error}" for names, error in self._errors))
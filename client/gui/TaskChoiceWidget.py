@@ -1,16 +1,48 @@
-from PySide6.QtCore import Signal, QSignalBlocker
+import logging
+from typing import Iterable
+
+from PySide6.QtCore import Signal, QSignalBlocker, QObject, QRunnable, QThreadPool, QTimer
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import QWidget
 
 from common.exceptions import AppError
-from common.TaskBatch import TaskBatch
+from common.TaskBatch import BatchTaskTuple, TaskBatch, TaskBatchErrors
 
 from client.task.Task import Task
 
+from client.gui.TaskBatchCompiler import TaskBatchCompiler
 from client.gui.UI.TaskChoiceWidget import Ui_TaskChoiceWidget
 
 
+TaskArgs = tuple[str, tuple[float, float], int, float, float]
+
+
+class TaskPreviewSignals(QObject):
+    finished = Signal(int, object, str)
+
+
+class TaskPreviewWorker(QRunnable):
+
+    def __init__(self, request: int, args: TaskArgs, signals: TaskPreviewSignals):
+        super().__init__()
+        self._request = request
+        self._args = args
+        self._signals = signals
+
+    def run(self):
+        task = None
+        try:
+            task = Task(*self._args) if self._args[0] else None
+            text = task.unicode_str() if task is not None else ''
+        except Exception as error:  # TODO
+            task = None
+            text = str(error)
+        self._signals.finished.emit(self._request, task, text)
+
+
 class TaskChoiceWidget(QWidget, Ui_TaskChoiceWidget):
+    PREVIEW_DELAY = 150
+
     complete = Signal()
 
     def __init__(self):
@@ -25,6 +57,18 @@ class TaskChoiceWidget(QWidget, Ui_TaskChoiceWidget):
         self.inputPoints.setRange(1, mx)
 
         self._task: Task | None = None
+        self._preview_request = 0
+        self._preview_pool = QThreadPool(self)
+        self._preview_pool.setMaxThreadCount(1)
+        self._preview_pool.start(Task.preload)
+        self._preview_signals = TaskPreviewSignals(self)
+        self._preview_signals.finished.connect(self._preview_finished)
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(self.PREVIEW_DELAY)
+        self._preview_timer.timeout.connect(self._start_preview)
+
+        self.batch_compiler = TaskBatchCompiler(self)
         self._task_batch: TaskBatch | None = None
         self.set_task_batch(self._task_batch)
         self.update_task()
@@ -35,6 +79,7 @@ class TaskChoiceWidget(QWidget, Ui_TaskChoiceWidget):
         self.inputProgram.hide()
         self.labelGroup.hide()
         self.inputGroup.hide()
+        self.viewDownload.hide()
 
     def _connect_ui(self):
         for ci in (self.inputProgram, self.inputGroup, self.inputName):
@@ -46,16 +91,61 @@ class TaskChoiceWidget(QWidget, Ui_TaskChoiceWidget):
     def task_batch(self):
         return list(self._task_batch)
 
-    def set_task_batch(self, task_batch: TaskBatch | None):
-        self._task_batch = task_batch
-        self.widgetStudent.setEnabled(task_batch is not None)
+    def set_task_batch(self, task_batch: Iterable[BatchTaskTuple] | None):
+        if task_batch is None:
+            self._task_batch = None
+            self.widgetStudent.setEnabled(False)
+            self.widgetTask.setEnabled(True)
+            self.batch_compiler.cancel()
+            sb = QSignalBlocker(self.inputName)
+            self.inputName.clear()
+        else:
+            self.begin_task_batch()
+            self.extend_task_batch(task_batch)
+            self.finish_task_batch(task_batch if isinstance(task_batch, TaskBatchErrors) else None)
+
+    def begin_task_batch(self):
+        """
+        Starts a batch received in parts, students become selectable as they arrive.
+        """
+        self._task_batch = []
+        self.widgetStudent.setEnabled(True)
         # self.widgetStudent.setHidden(task_batch is None)
-        self.widgetTask.setEnabled(task_batch is None)
-        if task_batch is not None:
-            self.inputName.setMaxCount(len(task_batch) + 1)
-            self.inputName.addItem('')
-            for i in task_batch:
-                self.inputName.addItem(i[0])
+        self.widgetTask.setEnabled(False)
+        self.batch_compiler.cancel()
+        sb = QSignalBlocker(self.inputName)
+        self.inputName.clear()
+        self.inputName.addItem('')
+
+    def extend_task_batch(self, rows: Iterable[BatchTaskTuple]):
+        rows = list(rows)
+        self._task_batch.extend(rows)
+        sb = QSignalBlocker(self.inputName)
+        self.inputName.addItems([r[0] for r in rows])
+
+    def finish_task_batch(self, errors: TaskBatchErrors | None = None):
+        self.viewDownload.hide()
+        self.batch_compiler.compile(self._task_batch)
+        if errors is not None:
+            errors.raise_for_errors()
+
+    def set_download_progress(self, received: int, total: int):
+        """
+        :param total: Size of batch being downloaded, negative if unknown.
+        """
+        if total < 0:
+            self.viewDownload.setRange(0, 0)
+            self.viewDownload.setFormat(f"Загрузка заданий: {received // 1024} КБ")
+        else:
+            self.viewDownload.setRange(0, total)
+            self.viewDownload.setValue(received)
+            self.viewDownload.setFormat("Загрузка заданий: %p%")
+        self.viewDownload.show()
+
+    def student_name(self) -> str | None:
+        if self._task_batch is None:
+            return None
+        return self.inputName.currentText() or None
 
     def set_task_displayed(self, display: bool):
         self.widgetTask.setHidden(not display)
@@ -75,24 +165,35 @@ class TaskChoiceWidget(QWidget, Ui_TaskChoiceWidget):
             self.inputError.setValue(task_tuple[5])
             self.inputConfidence.setValue(task_tuple[6])
 
-    def task(self) -> Task | None:
-        return Task(
+    def _task_args(self) -> TaskArgs:
+        return (
             self.inputF.text(), (self.inputStart.value(), self.inputEnd.value()),
             self.inputPoints.value(),
             self.inputError.value(), self.inputConfidence.value()
-        ) if self.inputF.text() else None
+        )
+
+    def task(self) -> Task | None:
+        args = self._task_args()
+        return Task(*args) if args[0] else None
 
     def update_task(self):
+        self._preview_request += 1
+        # Task of previous input is stale until preview of this request finishes.
         self._task = None
-        try:
-            self._task = self.task()
-        except Exception as error:  # TODO
-            self.viewTask.setText(str(error))
-            self.buttonComplete.setEnabled(False)
-        else:
-            enabled = self._task is not None
-            self.viewTask.setText(self._task.unicode_str() if enabled else '')
-            self.buttonComplete.setEnabled(enabled)
+        self.buttonComplete.setEnabled(False)
+        self._preview_timer.start()
+
+    def _start_preview(self):
+        self._preview_pool.clear()
+        self._preview_pool.start(TaskPreviewWorker(self._preview_request, self._task_args(), self._preview_signals))
+
+    def _preview_finished(self, request: int, task: Task | None, text: str):
+        if request != self._preview_request:
+            return
+        self._task = task
+        self.viewTask.setText(text)
+        self.buttonComplete.setEnabled(task is not None)
+        logging.getLogger('client.ui').debug(f"{self.__class__.__name__} task cache {Task.cache_info()}.")
 
     def _emit_complete(self):
         self.complete.emit()
@@ -1,13 +1,111 @@
-from io import StringIO
+import logging
 
 from PySide6.QtCore import Signal, QObject
 from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 
-from common.TaskBatch import read_task_batch
+from common.exceptions import AppError
+from common.TaskBatch import TaskBatch, TaskBatchErrors, TaskBatchParser
+
+from client.utils import PATH
+from client.task.DownloadCache import CachedDownload, DownloadCache, DownloadWriter
+
+
+class BatchStream:
+    """
+    Tasks batch being received, parsed and written to cache chunk by chunk.
+    """
+
+    def __init__(self, writer: DownloadWriter):
+        self.parser = TaskBatchParser(delimiter=',')
+        self.writer = writer
+        self.rows: TaskBatch = []
+
+
+class BatchSource:
+    """
+    State of a single source during update.
+    """
+
+    def __init__(self, url: str, cached: CachedDownload | None):
+        self.url = url
+        self.cached = cached
+        self.reply: QNetworkReply | None = None
+        self.stream: BatchStream | None = None
+        # Kept after stream is closed, so that progress of all sources never decreases.
+        # Total is None until response headers, negative if unknown.
+        self.received = 0
+        self.total: int | None = None
+        # Whether rows are published as they arrive, otherwise source is published from cache.
+        self.live = False
+        self.rows: TaskBatch = []
+        # Whether rows are final, rows of the following sources are held until then.
+        self.complete = False
+        self.published = 0
+        self.errors: TaskBatchErrors | None = None
+        self.changed = False
+        # Whether server answered with the current export, either new or confirming cached one.
+        self.confirmed = False
+        self.done = False
+        self.message: str | None = None
+
+
+class DownloadErrors(TaskBatchErrors):
+    """
+    Row errors of merged batch with failures of its sources.
+    """
+
+    def __init__(self, sources: list[BatchSource], conflicts: list[tuple[str, str]]):
+        super().__init__()
+        self._sources = [(s.url, s.errors, s.message) for s in sources]
+        self._conflicts = conflicts
+        for _, errors, _ in self._sources:
+            if errors is not None:
+                self.errors.extend(errors.errors)
+
+    def has_errors(self) -> bool:
+        return bool(self.errors or self._conflicts or any(m is not None for _, _, m in self._sources))
+
+    def error_str(self) -> str:
+        lines = []
+        for url, errors, message in self._sources:
+            if message is not None:
+                lines.append(f"Не удалось загрузить таблицу \"{url}\": {message}")
+            if errors is not None and errors.errors:
+                lines.append(f"Таблица \"{url}\":")
+                lines.append(errors.error_str())
+        for name, url in self._conflicts:
+            lines.append(f"Студент \"{name}\" из таблицы \"{url}\" уже получил другое задание, строка пропущена.")
+        return '\n'.join(lines)
+
+    def raise_for_errors(self):
+        if self.has_errors():
+            raise AppError(self.error_str()) from next((e.error for e in self.errors), None)
 
 
 class TaskDownloader(QObject):
+    """
+    Downloads tasks batch from several sources concurrently, merging them in order of sources.
+    Rows are streamed as they arrive, the last good export of each source is kept with its validators.
+    Cached batches are published immediately and revalidated with conditional requests,
+    network errors fall back to them and are reported with failed signal.
+    Sources without cached copy that fail are reported with errors of the merged batch.
+
+    A batch is published as started signal, any number of rows signals and updated signal once all sources finish.
+    Rows are published while downloading only if no batch is displayed yet,
+    a changed batch replacing the cached one is published after all sources are complete.
+    Rows of a source are published only after all previous sources are complete,
+    so that a student present in several sources always gets the task of the first of them.
+    Finished signal is emitted once all requests of update are done, whether or not batch changed.
+    """
+    URL = "https://docs.google.com/spreadsheets/d/{src}/export?format=csv"
+    TIMEOUT = 15000
+
+    started = Signal()
+    rows_received = Signal(object)
+    progress = Signal(int, int)
     updated = Signal()
+    finished = Signal()
+    failed = Signal(str)
     # HEADERS = {
     #     "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
     #     "accept-language": "ru",
@@ -30,35 +128,268 @@ class TaskDownloader(QObject):
     #     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x65) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.5845.180 Safari/537.36"
     # }
 
-    def __init__(self):
+    def __init__(self, cache: DownloadCache | None = None):
         super().__init__()
-        self._src = None
+        self._urls: list[str] = []
+        self._cache = cache if cache is not None else DownloadCache(PATH.DOWNLOADS)
 
+        # Single manager for all sources, so that connections to the same host are reused.
         self._manager = QNetworkAccessManager()
         self._manager.finished.connect(self._finished)
+        self._sources: list[BatchSource] = []
+
+        self._published: dict[str, tuple] = {}
+        self._conflicts: list[tuple[str, str]] = []
+        # Index of the first source not yet completely published, None if no batch is being published.
+        self._head: int | None = None
+        self._reported = False
 
-        self._task_batch = None
+        self._task_batch: TaskBatch | None = None
+        self._errors: DownloadErrors | None = None
 
     @property
-    def task_batch(self):
+    def task_batch(self) -> TaskBatch | None:
+        """
+        :return: The last complete merged batch.
+        """
         return self._task_batch
 
+    @property
+    def errors(self) -> DownloadErrors | None:
+        """
+        :return: Row and source errors of the last complete batch.
+        """
+        return self._errors
+
+    @property
+    def from_cache(self) -> bool:
+        """
+        :return: Whether current batch has cached parts not yet confirmed by server.
+        """
+        return any(s.cached is not None and not s.confirmed for s in self._sources)
+
     def set_source(self, src: str):
-        self._src = src
+        self.set_sources([src])
+
+    def set_sources(self, srcs: list[str]):
+        self.set_urls([self.URL.format(src=src) for src in srcs])
+
+    def set_url(self, url: str):
+        self.set_urls([url])
+
+    def set_urls(self, urls: list[str]):
+        self._urls = list(dict.fromkeys(urls))
 
     def update_tasks(self):
-        if not self._src:
+        if not self._urls:
             raise RuntimeError(f"{self} tasks source not set during update.")
-        r = QNetworkRequest(f"https://docs.google.com/spreadsheets/d/{self._src}/export?format=csv")
-        # for k, v in self.HEADERS.items():
-        #     r.setRawHeader(k.encode('utf-8'), v.encode('utf-8'))
-        self._manager.get(r)
+        previous, self._sources = self._sources, []
+        for source in previous:
+            if source.stream is not None:
+                source.stream.writer.abort()
+            if source.reply is not None:
+                source.reply.abort()
+        self._sources = [BatchSource(url, self._cache.load(url)) for url in self._urls]
+        self._head = None
+        self._reported = False
+
+        if self._task_batch is None:
+            for source in self._sources:
+                if source.cached is not None:
+                    self._load_cached(source, source.cached)
+                else:
+                    source.live = True
+            self._begin()
+            self._advance()
+
+        for source in self._sources:
+            r = QNetworkRequest(source.url)
+            r.setTransferTimeout(self.TIMEOUT)
+            # for k, v in self.HEADERS.items():
+            #     r.setRawHeader(k.encode('utf-8'), v.encode('utf-8'))
+            if source.cached is not None:
+                if source.cached.etag:
+                    r.setRawHeader(b'If-None-Match', source.cached.etag.encode('latin-1'))
+                if source.cached.last_modified:
+                    r.setRawHeader(b'If-Modified-Since', source.cached.last_modified.encode('latin-1'))
+            source.reply = self._manager.get(r)
+            source.reply.readyRead.connect(self._ready_read)
+
+    def _begin(self):
+        self._published = {}
+        self._conflicts = []
+        self._head = 0
+        for source in self._sources:
+            source.published = 0
+        self.started.emit()
+
+    def _advance(self):
+        """
+        Publishes rows of sources in their order, up to the first incomplete source, finishing batch after the last.
+        """
+        if self._head is None:
+            return
+        while self._head < len(self._sources):
+            source = self._sources[self._head]
+            self._publish(source, source.rows[source.published:])
+            source.published = len(source.rows)
+            if not source.complete:
+                return
+            self._head += 1
+        self._finish()
+
+    def _publish(self, source: BatchSource, rows: TaskBatch):
+        """
+        Publishes rows of source, dropping students published before.
+        """
+        res = []
+        for row in rows:
+            published = self._published.setdefault(row[0], row)
+            if published is row:
+                res.append(row)
+            elif published != row:
+                self._conflicts.append((row[0], source.url))
+        if res:
+            self.rows_received.emit(res)
+
+    def _load_cached(self, source: BatchSource, entry: CachedDownload | None):
+        source.complete = True
+        if entry is None:
+            logging.getLogger('client.app').warning(f"{self} lost cached tasks of \"{source.url}\".")
+            return
+        parser = TaskBatchParser(delimiter=',')
+        try:
+            for data in self._cache.read(entry):
+                source.rows.extend(parser.feed(data))
+        except OSError:
+            logging.getLogger('client.app').warning(f"{self} failed reading cached tasks of \"{source.url}\".",
+                                                    exc_info=True)
+        source.rows.extend(parser.close())
+        source.errors = parser
+
+    def _source(self, reply: QNetworkReply) -> BatchSource | None:
+        return next((s for s in self._sources if s.reply is reply), None)
+
+    def _ready_read(self):
+        source = self._source(self.sender())
+        if source is not None:
+            self._read(source)
+
+    def _read(self, source: BatchSource):
+        reply = source.reply
+        if source.stream is None:
+            if reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute) != 200:
+                return
+            total = reply.header(QNetworkRequest.KnownHeaders.ContentLengthHeader)
+            source.total = int(total) if total is not None else -1
+            source.stream = BatchStream(self._cache.writer(source.url))
+            if source.live:
+                source.rows = source.stream.rows
+        stream = source.stream
+        data = bytes(reply.readAll())
+        if not data:
+            return
+        source.received += len(data)
+        stream.writer.write(data)
+        stream.rows.extend(stream.parser.feed(data))
+        if source.live:
+            self._advance()
+            self._progress()
+
+    def _progress(self):
+        """
+        Progress of sources being published as they arrive, revalidation of displayed ones is not shown.
+        """
+        sources = [s for s in self._sources if s.live]
+        total = -1 if any(s.total is None and not s.done or s.total is not None and s.total < 0 for s in sources) \
+            else sum(s.total or 0 for s in sources)
+        self.progress.emit(sum(s.received for s in sources), total)
 
     def _finished(self, resp: QNetworkReply):
+        resp.deleteLater()
+        source = self._source(resp)
+        if source is None:
+            return
+        try:
+            self._source_finished(source, resp)
+        finally:
+            source.reply = None
+            source.done = True
+        if source.live:
+            source.complete = True
+            self._advance()
+        if all(s.done for s in self._sources):
+            self._complete()
+
+    def _source_finished(self, source: BatchSource, resp: QNetworkReply):
         if resp.error() != resp.NetworkError.NoError:
-            raise RuntimeError(f"Не удалось загрузить задание: {resp.errorString()}")
-        else:
-            data = resp.readAll()
-            io = StringIO(bytes(data).decode('utf-8'))
-            self._task_batch = read_task_batch(io, delimiter=',')
-            self.updated.emit()
+            if source.stream is not None:
+                source.stream.writer.abort()
+                source.stream = None
+            self._failed(source, resp.errorString())
+            return
+        status = resp.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        if status == 304 and source.cached is not None:
+            logging.getLogger('client.app').info(f"{self} tasks at \"{source.url}\" not modified.")
+            source.confirmed = True
+            return
+
+        self._read(source)
+        stream, source.stream = source.stream, None
+        if stream is None:
+            self._failed(source, f"неожиданный ответ сервера {status}")
+            return
+        stream.rows.extend(stream.parser.close())
+        if not self._is_batch(stream):
+            # Previous export is kept, as sign-in or error pages may be served with 200.
+            stream.writer.abort()
+            source.errors = stream.parser if source.live else None
+            self._failed(source, f"ответ сервера не является таблицей заданий: {len(stream.rows)} строк,"
+                                 f" {len(stream.parser.errors)} ошибок")
+            return
+        etag = bytes(resp.rawHeader(b'ETag')).decode('latin-1') or None
+        last_modified = bytes(resp.rawHeader(b'Last-Modified')).decode('latin-1') or None
+        entry = stream.writer.commit(etag, last_modified)
+        source.confirmed = True
+        if not source.live:
+            if source.cached is not None and source.cached.digest == entry.digest:
+                return
+            source.changed = True
+            source.complete = True
+        source.rows = stream.rows
+        source.errors = stream.parser
+
+    @staticmethod
+    def _is_batch(stream: BatchStream) -> bool:
+        """
+        :return: Whether received content has valid rows and no more invalid ones.
+        """
+        return bool(stream.rows) and len(stream.parser.errors) <= len(stream.rows)
+
+    def _failed(self, source: BatchSource, message: str):
+        if source.cached is None:
+            source.message = message
+            logging.getLogger('client.app').warning(f"{self} failed downloading tasks from \"{source.url}\": {message}")
+            return
+        logging.getLogger('client.app').warning(f"{self} failed updating tasks from \"{source.url}\","
+                                                f" using cached copy of {source.cached.time}: {message}")
+        self.failed.emit(message)
+
+    def _complete(self):
+        if any(s.changed for s in self._sources):
+            # Unchanged sources of this update have no rows yet, they are read from the confirmed cache.
+            for source in self._sources:
+                if not source.complete:
+                    self._load_cached(source, self._cache.load(source.url))
+            self._begin()
+            self._advance()
+        elif not self._reported and any(s.message is not None for s in self._sources):
+            self._finish()
+        self.finished.emit()
+
+    def _finish(self):
+        self._head = None
+        self._reported = True
+        self._task_batch = list(self._published.values())
+        self._errors = DownloadErrors(self._sources, self._conflicts)
+        self.updated.emit()
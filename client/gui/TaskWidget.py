@@ -1,19 +1,24 @@
 import functools
 import logging
 import math
+import os
 import random
+import time
 from typing import Self
 
 from PySide6.QtCore import QSignalBlocker
 from PySide6.QtGui import QFont
-from PySide6.QtWidgets import QWidget
+from PySide6.QtWidgets import QVBoxLayout, QWidget
 
 from common.exceptions import AppError
 from common.task.exceptions import TaskError
 from common.task.const import STEP, ERROR, ACTION
+from common.task.record import write_record
 
-from client.utils import STATE
+from client.utils import STATE, PATH
 from client.task.Task import Task
+from client.task.TaskJournal import TaskJournal
+from client.task.ActionProfiler import PROFILER
 from common import user_math
 
 from client.gui.NotifierTaskSession import NotifierTaskSession
@@ -22,7 +27,7 @@ from client.gui.ErrorTableWidget import ErrorTableWidget
 
 from client.gui.controllers.SpoilerController import SpoilerController
 from client.gui.controllers.error_controllers import ErrorPaletteController
-from client.gui.plot.PlotController import PlotController
+from client.gui.plot.PlotBackend import create_plot_backend
 from client.gui.controllers.StatsController import StatsController
 
 
@@ -57,7 +62,10 @@ class TaskWidget(QWidget, Ui_TaskWidget):
             (self.widgetRect, self.widgetPoints, self.widgetIntegral, self.widgetError)
         )}
 
-        self._plot_controller = PlotController(self.viewPlot)
+        self._plot_controller = create_plot_backend()
+        layout = QVBoxLayout(self.viewPlot)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self._plot_controller.widget)
 
         self._spoilers: dict[STEP, SpoilerController] = {}
         for step, w in self._step_widgets.items():
@@ -69,6 +77,8 @@ class TaskWidget(QWidget, Ui_TaskWidget):
             w.adjustSize()
 
         self._task_session: NotifierTaskSession | None = None
+        self._journal: TaskJournal | None = None
+        self._student_name: str | None = None
         self._error: TaskError | None = None
         self._error_controllers = {
             ERROR.X_0: ErrorPaletteController(self.inputRectX1),
@@ -137,31 +147,35 @@ class TaskWidget(QWidget, Ui_TaskWidget):
 
     def _update_plot(self):
         if self._plot_controller.is_loaded:
-            ts = self._task_session
-            if ts is not None:
-                self._plot_controller.set_task(ts.task)
-                state = ts.state
-                if ts.state.int_x and ts.state.int_y:
-                    self._plot_controller.set_rect(
-                        *ts.state.int_x, *ts.state.int_y
-                    )
+            start = PROFILER.start()
+            try:
+                ts = self._task_session
+                if ts is not None:
+                    self._plot_controller.set_task(ts.task)
+                    state = ts.state
+                    if ts.state.int_x and ts.state.int_y:
+                        self._plot_controller.set_rect(
+                            *ts.state.int_x, *ts.state.int_y
+                        )
+                    else:
+                        self._plot_controller.set_rect(
+                            self.inputRectX1.value(),
+                            self.inputRectX2.value(),
+                            self.inputRectY1.value(),
+                            self.inputRectY2.value(),
+                        )
+                    self._plot_controller.set_rect_fill(ts.step != STEP.RECT)
+                    points = ts.state.points
+                    self._plot_controller.set_points(points)
+                    self._plot_controller.select_point(None if ts.state.point_counted else (len(points) - 1))
+                    self._plot_controller.update_plot()
                 else:
-                    self._plot_controller.set_rect(
-                        self.inputRectX1.value(),
-                        self.inputRectX2.value(),
-                        self.inputRectY1.value(),
-                        self.inputRectY2.value(),
-                    )
-                self._plot_controller.set_rect_fill(ts.step != STEP.RECT)
-                points = ts.state.points
-                self._plot_controller.set_points(points)
-                self._plot_controller.select_point(None if ts.state.point_counted else (len(points) - 1))
-                self._plot_controller.update_plot()
-            else:
-                self._plot_controller.reset_data()
-                self._plot_controller.update_plot()
+                    self._plot_controller.reset_data()
+                    self._plot_controller.update_plot()
+            finally:
+                PROFILER.stop(start, PROFILER.PLOT, self._plot_controller.__class__.__name__)
 
-    def _task_init(self):
+    def _task_init(self, start: bool = True):
         task = self._task_session.task
         self.viewTaskF.setText(task.f_unicode_str())
         self.viewTaskInterval.setText(self.viewTaskInterval.__text.format(
@@ -172,7 +186,8 @@ class TaskWidget(QWidget, Ui_TaskWidget):
             c=str(task.confidence)
         ))
 
-        self._task_session.start()
+        if start:
+            self._task_session.start()
         self._hint_step()
         for step in self._STEPS:
             is_current = step == self._task_session.step
@@ -188,12 +203,72 @@ class TaskWidget(QWidget, Ui_TaskWidget):
     def _register_session_error(self, error: ERROR):
         self._update_stats()
 
-    def set_task(self, task: Task):
+    def set_task(self, task: Task, student_name: str | None = None, resume: bool = False):
+        """
+        :param resume: Restore session of the task from journal instead of starting a new one.
+        """
+        self._student_name = student_name
+        self._close_journal()
         self._task_session = NotifierTaskSession(task)
         self._task_session.notifier.on_action.connect(self._register_session_action)
         self._task_session.notifier.on_error.connect(self._register_session_error)
-        self._task_init()
+        if resume:
+            self._journal = TaskJournal.resume(PATH.JOURNAL, self._task_session)
+            self._task_init(start=False)
+            self._restore_init()
+        else:
+            self._open_journal()
+            self._task_init()
+            self._rect_init()
+
+    def _record_task(self) -> tuple:
+        task = self._task_session.task
+        return task.f_source, *task.interval, task.min_points, task.error, task.confidence
+
+    def _open_journal(self):
+        try:
+            self._journal = TaskJournal.create(PATH.JOURNAL, self._student_name, self._record_task(),
+                                               self._task_session.task.f_srepr)
+        except OSError:
+            logging.getLogger('client.app').exception(f"{self} failed creating session journal \"{PATH.JOURNAL}\".")
+        else:
+            self._task_session.set_journal(self._journal)
+
+    def _close_journal(self, discard: bool = False):
+        if self._journal is not None:
+            self._task_session.set_journal(None)
+            self._journal.close()
+            self._journal = None
+            if discard:
+                TaskJournal.discard(PATH.JOURNAL)
+
+    def _restore_init(self):
+        ts = self._task_session
+        state = ts.state
         self._rect_init()
+        if state.int_x is not None and state.int_y is not None:
+            for inp, value in zip((self.inputRectX1, self.inputRectX2, self.inputRectY1, self.inputRectY2),
+                                  (*state.int_x, *state.int_y)):
+                inp.setValue(value)
+        if ts.step is STEP.POINTS:
+            self._points_update_enough()
+            if state.point_counted:
+                self._points_generate()
+            else:
+                self._points_show(tuple(state.points[-1].tolist()))
+        if ts.step >= STEP.POINTS:
+            self._points_update_counters()
+        if ts.step >= STEP.INTEGRAL:
+            self._integral_init()
+            if state.result is not None:
+                self.inputIntResult.setValue(state.result)
+        if ts.step >= STEP.ERROR:
+            self._error_init()
+        self._spoil_step()
+        self._update_stats()
+        self._update_plot()
+        if ts.step is STEP.END:
+            self._complete()
 
     def _hint_step(self):
         if self._task_session.step in self.hints:
@@ -234,14 +309,18 @@ class TaskWidget(QWidget, Ui_TaskWidget):
         def wrapper(self: Self, *args, **kwargs):
             if self._task_session is None:
                 raise AppError(f"Сессия выполнения задания не задана при вызове {func}.")
-            self._set_error()
-            res = None
+            start = PROFILER.start()
             try:
-                res = func(self, *args, **kwargs)
-            except TaskError as error:
-                self._set_error(error)
-            self._update_plot()
-            return res
+                self._set_error()
+                res = None
+                try:
+                    res = func(self, *args, **kwargs)
+                except TaskError as error:
+                    self._set_error(error)
+                self._update_plot()
+                return res
+            finally:
+                PROFILER.stop(start, PROFILER.WIDGET, func.__name__)
 
         return wrapper
 
@@ -330,18 +409,23 @@ class TaskWidget(QWidget, Ui_TaskWidget):
         y = self._task_session.state.int_y
         p = (x[0] + random.random() * (x[1] - x[0]), y[0] + random.random() * (y[1] - y[0]))
         self._task_session.generate_point(p)
+        self._points_show(p)
 
+    def _points_show(self, p: tuple[float, float]):
         self.viewPointsX.setText(f'{p[0]:.3g}')
         self.viewPointsY.setText(f'{p[1]:.3g}')
         self.viewPointsFY.setText(f'{self._task_session.task.f(p[0]):.3g}')
 
     @check_error
     def _points_count(self):
-        hits = self._task_session.state.point_hits
-        self.viewPointsMiss.display(sum(not e for e in hits))
-        self.viewPointsHit.display(sum(bool(e) for e in hits))
+        self._points_update_counters()
         self._points_generate()
 
+    def _points_update_counters(self):
+        point_buffer = self._task_session.state.point_buffer
+        self.viewPointsMiss.display(point_buffer.miss_count)
+        self.viewPointsHit.display(point_buffer.hit_count)
+
     @check_error
     def _points_miss(self):
         self._task_session.count_point(False)
@@ -364,10 +448,8 @@ class TaskWidget(QWidget, Ui_TaskWidget):
         state = ts.state
         int_x, int_y = state.int_x, state.int_y
         area = (int_x[1] - int_x[0]) * (int_y[1] - int_y[0])
-        np = len(state.points)
-        nph = sum(state.point_hits)
         negative = (int_x[1] - int_x[0]) * -min(int_y[0], 0)
-        res = area * (nph / np) - negative
+        res = area * state.point_buffer.hit_ratio - negative
         self.inputIntResult.setDecimals(user_math.meaning_decimals(res, ts.dec_accuracy))
         buffer = abs(res) * self.INPUT_BUFFER
         self.inputIntResult.setRange(-buffer, +buffer)
@@ -384,11 +466,11 @@ class TaskWidget(QWidget, Ui_TaskWidget):
         state = session.state
         task = session.task
 
-        self.viewErrorP.setText(f'{sum(state.point_hits) / len(state.points):.3g}')
+        p = state.point_buffer.hit_ratio
+        self.viewErrorP.setText(f'{p:.3g}')
         self.viewErrorConfidence.setText(f'{task.confidence:.3g}')
         self.viewErrorError.setText(f'{task.error:.3g}')
 
-        p = sum(state.point_hits) / len(state.points)
         error_true = p * (1 - p) / (task.error * session.laplace.get_inverse(task.confidence)) ** 2
         self.inputError.setRange(1, int(error_true * 2))
         if STATE.DEBUG:
@@ -410,4 +492,18 @@ class TaskWidget(QWidget, Ui_TaskWidget):
         self._complete()
 
     def _complete(self):
-        ...
+        self._save_record()
+        self._close_journal(discard=True)
+
+    def _save_record(self):
+        ts = self._task_session
+        name = f"{int(time.time())}_{self._student_name or ''}".strip('_')
+        path = os.path.join(PATH.RECORDS, ''.join(c if c.isalnum() or c in ' ._-' else '_' for c in name) + '.jsonl')
+        try:
+            os.makedirs(PATH.RECORDS, exist_ok=True)
+            with open(path, mode='w', encoding='utf-8') as f:
+                write_record(f, self._student_name, self._record_task(), ts.stats)
+        except OSError:
+            logging.getLogger('client.app').exception(f"{self} failed saving session record to \"{path}\".")
+        else:
+            logging.getLogger('client.app').info(f"{self} saved session record to \"{path}\".")
@@ -58,7 +58,7 @@ class StatsController:
             if step is not None:
                 gv(step, 0).display(int(step == stats.state.step))
                 gv(step, 1).display(int(step < stats.state.step))
-                gv(step, 2).display(len(stats.errors.get(step, ())))
+                gv(step, 2).display(stats.error_count(step))
         gv(None, 0).display(int(stats.state.step != STEP.END))
         gv(None, 1).display(int(stats.state.step == STEP.END))
-        gv(None, 2).display(sum(map(len, stats.errors.values())))
+        gv(None, 2).display(stats.error_count())
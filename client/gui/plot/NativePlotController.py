@@ -0,0 +1,198 @@
+import math
+from typing import Sequence
+
+import numpy as np
+from PySide6.QtCore import QPointF, QRectF, Qt, QTimer
+from PySide6.QtGui import QColor, QPainter, QPaintEvent, QPen, QPolygonF
+from PySide6.QtWidgets import QWidget
+
+from client.gui.plot.PlotBackend import PlotBackend
+from common.task.const import Point
+
+
+class PlotWidget(QWidget):
+    COLOR_BACKGROUND = QColor('white')
+    COLOR_GRID = QColor(235, 235, 235)
+    COLOR_AXIS = QColor(68, 68, 68)
+    COLOR_FUNCTION = QColor('blue')
+    COLOR_RECT = QColor(68, 68, 68)
+    COLOR_RECT_FILL = QColor(0, 255, 0, 64)
+    COLOR_POINT = QColor('orange')
+    COLOR_POINT_SELECT = QColor('red')
+    POINT_SIZE = 10
+    MARGINS = (50, 10, 10, 25)
+    TICKS = 6
+    PADDING = 0.05
+
+    def __init__(self, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self._function = np.empty((2, 0))
+        self._rect: tuple[float, float, float, float] | None = None
+        self._rect_fill = False
+        self._points = np.empty((16, 2))
+        self._n_points = 0
+        self._selected: int | None = None
+
+    def reset_data(self):
+        self._function = np.empty((2, 0))
+        self._rect = None
+        self._rect_fill = False
+        self._n_points = 0
+        self._selected = None
+
+    def set_function(self, xs: np.ndarray, ys: np.ndarray):
+        self._function = np.stack((np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)))
+
+    def set_rect(self, x0: float, x1: float, y0: float, y1: float):
+        self._rect = (x0, x1, y0, y1)
+
+    def set_rect_fill(self, fill: bool):
+        self._rect_fill = fill
+
+    def set_points(self, points: Sequence[Point] | np.ndarray):
+        self._n_points = 0
+        self._selected = None
+        self.extend_points(points)
+
+    def extend_points(self, points: Sequence[Point] | np.ndarray):
+        ps = np.asarray(points, dtype=float).reshape(-1, 2)
+        n = self._n_points + len(ps)
+        if n > len(self._points):
+            grown = np.empty((max(n, 2 * len(self._points)), 2))
+            grown[:self._n_points] = self._points[:self._n_points]
+            self._points = grown
+        self._points[self._n_points:n] = ps
+        self._n_points = n
+
+    def select_point(self, index: int | None):
+        self._selected = index
+
+    @property
+    def points(self) -> np.ndarray:
+        return self._points[:self._n_points]
+
+    def _data_range(self) -> tuple[float, float, float, float] | None:
+        xs = [self._function[0], self.points[:, 0]]
+        ys = [self._function[1], self.points[:, 1]]
+        if self._rect is not None:
+            xs.append(np.asarray(self._rect[:2]))
+            ys.append(np.asarray(self._rect[2:]))
+        xs, ys = np.concatenate(xs), np.concatenate(ys)
+        finite = np.isfinite(xs) & np.isfinite(ys)
+        if not finite.any():
+            return None
+        xs, ys = xs[finite], ys[finite]
+        x0, x1, y0, y1 = xs.min(), xs.max(), ys.min(), ys.max()
+        dx = (x1 - x0) * self.PADDING or 1
+        dy = (y1 - y0) * self.PADDING or 1
+        return x0 - dx, x1 + dx, y0 - dy, y1 + dy
+
+    @staticmethod
+    def _ticks(lo: float, hi: float, n: int) -> np.ndarray:
+        step = (hi - lo) / n
+        power = 10 ** math.floor(math.log10(step))
+        step = next(m * power for m in (1, 2, 5, 10) if m * power >= step)
+        return np.arange(math.ceil(lo / step), math.floor(hi / step) + 1) * step
+
+    def paintEvent(self, event: QPaintEvent):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.COLOR_BACKGROUND)
+        data_range = self._data_range()
+        if data_range is None:
+            return
+        x0, x1, y0, y1 = data_range
+        left, top, right, bottom = self.MARGINS
+        area = QRectF(left, top, max(1, self.width() - left - right), max(1, self.height() - top - bottom))
+
+        def map_x(x):
+            return area.left() + (np.asarray(x) - x0) / (x1 - x0) * area.width()
+
+        def map_y(y):
+            return area.top() + (y1 - np.asarray(y)) / (y1 - y0) * area.height()
+
+        metrics = painter.fontMetrics()
+        for tick in self._ticks(x0, x1, self.TICKS):
+            x = float(map_x(tick))
+            painter.setPen(self.COLOR_GRID)
+            painter.drawLine(QPointF(x, area.top()), QPointF(x, area.bottom()))
+            painter.setPen(self.COLOR_AXIS)
+            label = f"{round(tick, 12):g}"
+            painter.drawText(QPointF(x - metrics.horizontalAdvance(label) / 2, area.bottom() + metrics.height()),
+                             label)
+        for tick in self._ticks(y0, y1, self.TICKS):
+            y = float(map_y(tick))
+            painter.setPen(self.COLOR_GRID)
+            painter.drawLine(QPointF(area.left(), y), QPointF(area.right(), y))
+            painter.setPen(self.COLOR_AXIS)
+            label = f"{round(tick, 12):g}"
+            painter.drawText(QPointF(area.left() - metrics.horizontalAdvance(label) - 4, y + metrics.ascent() / 2),
+                             label)
+
+        painter.setClipRect(area)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if self._rect is not None:
+            rx0, rx1 = sorted(map(float, map_x(self._rect[:2])))
+            ry0, ry1 = sorted(map(float, map_y(self._rect[2:])))
+            painter.setPen(QPen(self.COLOR_RECT, 2))
+            painter.setBrush(self.COLOR_RECT_FILL if self._rect_fill else Qt.BrushStyle.NoBrush)
+            painter.drawRect(QRectF(rx0, ry0, rx1 - rx0, ry1 - ry0))
+
+        if self._function.shape[1]:
+            painter.setPen(QPen(self.COLOR_FUNCTION, 2))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            fx, fy = map_x(self._function[0]), map_y(np.clip(self._function[1], y0 - (y1 - y0), y1 + (y1 - y0)))
+            finite = np.isfinite(fx) & np.isfinite(fy)
+            bounds = np.flatnonzero(np.diff(np.concatenate(([0], finite.view(np.int8), [0]))))
+            for start, end in zip(bounds[::2], bounds[1::2]):
+                painter.drawPolyline(QPolygonF(list(map(QPointF, fx[start:end], fy[start:end]))))
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        radius = self.POINT_SIZE / 2
+        for i, (px, py) in enumerate(zip(map_x(self.points[:, 0]), map_y(self.points[:, 1]))):
+            painter.setBrush(self.COLOR_POINT_SELECT if i == self._selected else self.COLOR_POINT)
+            painter.drawEllipse(QPointF(px, py), radius, radius)
+
+
+class NativePlotController(PlotBackend):
+    """
+    Plot drawn with QPainter, lightweight alternative to web PlotController.
+    """
+
+    def __init__(self, widget: PlotWidget | None = None):
+        super().__init__()
+        self._widget = widget if widget is not None else PlotWidget()
+
+        QTimer.singleShot(0, self.loaded.emit)
+
+    @property
+    def widget(self) -> QWidget:
+        return self._widget
+
+    @property
+    def is_loaded(self) -> bool:
+        return True
+
+    def _reset_data(self):
+        self._widget.reset_data()
+
+    def _update_plot(self):
+        self._widget.update()
+
+    def _set_function_plot(self, xs: np.ndarray, ys: np.ndarray):
+        self._widget.set_function(xs, ys)
+
+    def _set_rect(self, x0: float, x1: float, y0: float, y1: float):
+        self._widget.set_rect(x0, x1, y0, y1)
+
+    def _set_rect_fill(self, fill: bool):
+        self._widget.set_rect_fill(fill)
+
+    def _set_points(self, points: Sequence[Point]):
+        self._widget.set_points(points)
+
+    def _extend_points(self, points: Sequence[Point], draw: bool):
+        self._widget.extend_points(points)
+
+    def _select_point(self, index: int | None, draw: bool):
+        self._widget.select_point(index)
@@ -0,0 +1,160 @@
+import importlib
+from typing import Sequence
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QWidget
+
+from client.task.Task import Task
+from client.gui.plot.sampling import sample_adaptive
+from common.task.const import Point
+from client.utils import CONST, STATE
+
+_BACKEND_CLASSES = {
+    'web': ('client.gui.plot.PlotController', 'PlotController'),
+    'native': ('client.gui.plot.NativePlotController', 'NativePlotController'),
+}
+
+
+class PlotBackend(QObject):
+    """
+    Plot of task session state.
+    Changes made by setters may be postponed until update_plot call.
+
+    Setters compare with state already sent to the view and pass only changes to backend primitives,
+    which are called with draw=True when the view is expected to draw the change immediately.
+    """
+    F_PLOT_PIXELS_PER_POINT = 2
+    F_PLOT_MIN_POINTS = 100
+    F_PLOT_MIN_HEIGHT = 100
+    F_PLOT_MAX_REFINE = 16
+    F_PLOT_MARGIN = 0.2
+    # Whether view draws appended points and selection on its own, without full update.
+    INCREMENTAL = False
+
+    loaded = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self._reset_page_state()
+
+    def _reset_page_state(self):
+        self._page_task: Task | None = None
+        self._page_rect: tuple[float, float, float, float] | None = None
+        self._page_rect_fill: bool | None = None
+        self._page_points = 0
+        self._page_selected: int | None = None
+        self._dirty = True
+
+    @property
+    def widget(self) -> QWidget:
+        raise NotImplementedError
+
+    @property
+    def is_loaded(self) -> bool:
+        raise NotImplementedError
+
+    def reset_data(self):
+        self._reset_data()
+        self._reset_page_state()
+
+    def update_plot(self):
+        if self._dirty:
+            self._update_plot()
+            self._dirty = False
+
+    def set_task(self, task: Task):
+        if task is self._page_task:
+            return
+        self.reset_data()
+        self._set_function_plot(*self._function_plot(task))
+        self._page_task = task
+
+    def set_rect(self, x0: float, x1: float, y0: float, y1: float):
+        if (x0, x1, y0, y1) != self._page_rect:
+            self._set_rect(x0, x1, y0, y1)
+            self._page_rect = (x0, x1, y0, y1)
+            self._dirty = True
+
+    def set_rect_fill(self, fill: bool):
+        if fill != self._page_rect_fill:
+            self._set_rect_fill(fill)
+            self._page_rect_fill = fill
+            self._dirty = True
+
+    def _draw_now(self) -> bool:
+        return self.INCREMENTAL and not self._dirty
+
+    def add_point(self, point: Point):
+        draw = self._draw_now()
+        self._extend_points([point], draw)
+        self._page_points += 1
+        self._dirty |= not draw
+
+    def set_points(self, points: Sequence[Point]):
+        if len(points) < self._page_points or (self._dirty and len(points) != self._page_points):
+            self._set_points(points)
+            self._page_selected = None
+            self._dirty = True
+        elif len(points) > self._page_points:
+            draw = self._draw_now()
+            self._extend_points(points[self._page_points:], draw)
+            self._dirty |= not draw
+        self._page_points = len(points)
+
+    def select_point(self, index: int | None):
+        if index != self._page_selected:
+            draw = self._draw_now()
+            self._select_point(index, draw)
+            self._page_selected = index
+            self._dirty |= not draw
+
+    def _reset_data(self):
+        raise NotImplementedError
+
+    def _update_plot(self):
+        raise NotImplementedError
+
+    def _set_function_plot(self, xs: np.ndarray, ys: np.ndarray):
+        raise NotImplementedError
+
+    def _set_rect(self, x0: float, x1: float, y0: float, y1: float):
+        raise NotImplementedError
+
+    def _set_rect_fill(self, fill: bool):
+        raise NotImplementedError
+
+    def _set_points(self, points: Sequence[Point]):
+        raise NotImplementedError
+
+    def _extend_points(self, points: Sequence[Point], draw: bool):
+        raise NotImplementedError
+
+    def _select_point(self, index: int | None, draw: bool):
+        raise NotImplementedError
+
+    def _function_plot(self, task: Task) -> np.ndarray:
+        """
+        :return: Function plot xs and ys stacked, sampled for current widget size and kept as persisted task artifact.
+        """
+        dist = task.interval[1] - task.interval[0]
+        margin = dist * self.F_PLOT_MARGIN
+        n = max(self.F_PLOT_MIN_POINTS, self.widget.width() // self.F_PLOT_PIXELS_PER_POINT)
+        height = max(self.widget.height(), self.F_PLOT_MIN_HEIGHT)
+        return task.artifact(
+            f'plot_{self.F_PLOT_MARGIN}_{n}_{height}_{self.F_PLOT_MAX_REFINE}',
+            lambda: np.stack(sample_adaptive(task.f_array, task.interval[0] - margin, task.interval[1] + margin,
+                                             n, height, max_points=n * self.F_PLOT_MAX_REFINE)),
+            persist=True
+        )
+
+
+def create_plot_backend(name: str | None = None) -> PlotBackend:
+    """
+    Imports backend module only when requested, so that web backend does not load QtWebEngine otherwise.
+    """
+    name = STATE.PLOT_BACKEND if name is None else name
+    if name not in CONST.PLOT_BACKENDS:
+        raise ValueError(f"Unknown plot backend \"{name}\", expected one of {CONST.PLOT_BACKENDS}.")
+    module, cls = _BACKEND_CLASSES[name]
+    return getattr(importlib.import_module(module), cls)()
@@ -1,27 +1,30 @@
 import json
 import logging
+from typing import Sequence
 
-from PySide6.QtCore import QUrl, QEvent, QObject, Qt, Signal
+import numpy as np
+from PySide6.QtCore import QUrl, QEvent, QObject, Qt, Signal, Slot
+from PySide6.QtWebChannel import QWebChannel
 from PySide6.QtWebEngineCore import QWebEnginePage
 from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtWidgets import QMainWindow
+from PySide6.QtWidgets import QMainWindow, QWidget
 
-from client.task.Task import Function, Task
+from client.task.Task import Function
+from client.gui.plot.PlotBackend import PlotBackend
+from client.gui.plot.encoding import encode_float64
 from common.task.const import Point
 from client.utils import STATE, PATH
 
 
-class PlotController(QObject):
-    F_PLOT_POINTS = 1000
-    F_PLOT_MARGIN = 0.2
+class PlotController(PlotBackend):
+    INCREMENTAL = True
 
-    loaded = Signal()
-
-    def __init__(self, view: QWebEngineView):
+    def __init__(self, view: QWebEngineView | None = None):
         super().__init__()
-        self._view = view
+        self._view = view if view is not None else QWebEngineView()
         self._plot_page = PlotPage(self)
-        self._plot_page.loadFinished.connect(self._load_finished)
+        self._plot_page.loadStarted.connect(self._reset_page_state)
+        self._plot_page.ready.connect(self._load_finished)
 
         if STATE.DEBUG:
             self._dev_window = DevToolsWindow(self._plot_page.devToolsPage())
@@ -31,6 +34,10 @@ class PlotController(QObject):
     def _load_finished(self):
         self.loaded.emit()
 
+    @property
+    def widget(self) -> QWidget:
+        return self._view
+
     @property
     def is_loaded(self) -> bool:
         return self._plot_page.is_loaded
@@ -49,49 +56,71 @@ class PlotController(QObject):
         self._view.page().javaScriptConsoleMessage = self._javascript_console_message
         self._view.resizeEvent = self._resize_event
 
-    def reset_data(self):
+    def _reset_data(self):
         self._plot_page.reset_data()
 
-    def update_plot(self):
+    def _update_plot(self):
         self._plot_page.update_plot()
 
-    def set_task(self, task: Task):
-        self._plot_page.reset_data()
+    def _set_function_plot(self, xs: np.ndarray, ys: np.ndarray):
+        self._plot_page.set_function_plot(xs, ys)
 
-        points: list[Point] = []
-        dist = task.interval[1] - task.interval[0]
-        margin = dist * self.F_PLOT_MARGIN
-        margin_start = task.interval[0] - margin
-        margin_dist = dist + margin * 2
-        for i in range(self.F_PLOT_POINTS):
-            x = margin_start + margin_dist * (i / self.F_PLOT_POINTS)
-            points.append((x, task.f(x)))
-        self._plot_page.set_function_plot(points)
-
-    def set_rect(self, x0: float, x1: float, y0: float, y1: float):
+    def _set_rect(self, x0: float, x1: float, y0: float, y1: float):
         self._plot_page.set_rect(x0, x1, y0, y1)
 
-    def set_rect_fill(self, fill: bool):
+    def _set_rect_fill(self, fill: bool):
         self._plot_page.set_rect_fill(fill)
 
-    def add_point(self, point: Point):
-        self._plot_page.add_point(*point)
-
-    def set_points(self, points: list[Point]):
+    def _set_points(self, points: Sequence[Point]):
         self._plot_page.set_points(points)
 
-    def select_point(self, index: int):
-        self._plot_page.select_point(index)
+    def _extend_points(self, points: Sequence[Point], draw: bool):
+        if draw:
+            self._plot_page.extend_points(points)
+        else:
+            for point in points:
+                self._plot_page.add_point(*point)
+
+    def _select_point(self, index: int | None, draw: bool):
+        self._plot_page.select_point(index, restyle=draw)
+
+
+class PlotBridge(QObject):
+    reset_data = Signal()
+    update_plot = Signal()
+    set_function_plot = Signal(str, str)
+    set_rect = Signal(float, float, float, float)
+    set_rect_fill = Signal(bool)
+    add_point = Signal(float, float)
+    set_points = Signal(str, str)
+    extend_points = Signal(str, str)
+    select_point = Signal(int)
+    select_point_restyle = Signal(int)
+
+    ready = Signal()
+
+    @Slot()
+    def set_ready(self):
+        self.ready.emit()
 
 
 class PlotPage(QWebEnginePage):
+    CHANNEL = True
+
+    ready = Signal()
 
-    def __init__(self, controller: PlotController):
+    def __init__(self, controller: PlotController, channel: bool | None = None):
         super().__init__(controller)
+        self._channel = self.CHANNEL if channel is None else channel
         self._is_loaded = False
         self.loadStarted.connect(self._load_started)
         self.loadFinished.connect(self._load_finished)
 
+        self._bridge = PlotBridge(self)
+        self._bridge.ready.connect(self._bridge_ready)
+        self.setWebChannel(QWebChannel(self))
+        self.webChannel().registerObject('bridge', self._bridge)
+
         self.load(QUrl.fromLocalFile(PATH.PLOT_HTML))
         if STATE.DEBUG:
             self.setDevToolsPage(QWebEnginePage(self))
@@ -100,45 +129,90 @@ class PlotPage(QWebEnginePage):
         self._is_loaded = False
 
     def _load_finished(self):
-        self._is_loaded = True
+        if not self._channel:
+            self._is_loaded = True
+            self.ready.emit()
+
+    def _bridge_ready(self):
+        if self._channel:
+            self._is_loaded = True
+            self.ready.emit()
 
     @property
     def is_loaded(self) -> bool:
         return self._is_loaded
 
+    @property
+    def channel(self) -> bool:
+        return self._channel
+
     def reset_data(self):
-        self.runJavaScript(f"resetPlotData()")
+        if self._channel:
+            self._bridge.reset_data.emit()
+        else:
+            self.runJavaScript(f"resetPlotData()")
 
     def update_plot(self):
-        self.runJavaScript(f"updatePlot()")
-
-    def set_function_plot(self, points: list[Point]):
-        self.runJavaScript(
-            f"setFunctionPlot({json.dumps([p[0] for p in points])}, {json.dumps([p[1] for p in points])})")
+        if self._channel:
+            self._bridge.update_plot.emit()
+        else:
+            self.runJavaScript(f"updatePlot()")
+
+    def set_function_plot(self, xs: Sequence[float] | np.ndarray, ys: Sequence[float] | np.ndarray):
+        if self._channel:
+            self._bridge.set_function_plot.emit(encode_float64(xs), encode_float64(ys))
+        else:
+            self.runJavaScript(
+                f"setFunctionPlot({json.dumps(list(map(float, xs)))}, {json.dumps(list(map(float, ys)))})")
 
     def set_rect(self, x0: float, x1: float, y0: float, y1: float):
-        self.runJavaScript(
-            f"setRect({x0}, {x1}, {y0}, {y1})"
-        )
+        if self._channel:
+            self._bridge.set_rect.emit(x0, x1, y0, y1)
+        else:
+            self.runJavaScript(
+                f"setRect({x0}, {x1}, {y0}, {y1})"
+            )
 
     def set_rect_fill(self, fill: bool):
-        self.runJavaScript(
-            f"setRectFill({'true' if fill else 'false'})"
-        )
+        if self._channel:
+            self._bridge.set_rect_fill.emit(fill)
+        else:
+            self.runJavaScript(
+                f"setRectFill({'true' if fill else 'false'})"
+            )
 
     def add_point(self, x: float, y: float):
-        self.runJavaScript(
-            f"addPoint({x}, {y})"
-        )
-
-    def set_points(self, points: list[Point]):
-        self.runJavaScript(
-            f"setPoints({json.dumps([p[0] for p in points])}, {json.dumps([p[1] for p in points])})")
-
-    def select_point(self, index: int):
-        self.runJavaScript(
-            f"selectPoint({index if isinstance(index, int) else 'null'})"
-        )
+        if self._channel:
+            self._bridge.add_point.emit(x, y)
+        else:
+            self.runJavaScript(
+                f"addPoint({x}, {y})"
+            )
+
+    def set_points(self, points: Sequence[Point] | np.ndarray):
+        if self._channel:
+            ps = np.asarray(points, dtype=float).reshape(-1, 2)
+            self._bridge.set_points.emit(encode_float64(ps[:, 0]), encode_float64(ps[:, 1]))
+        else:
+            self.runJavaScript(
+                f"setPoints({json.dumps([p[0] for p in points])}, {json.dumps([p[1] for p in points])})")
+
+    def extend_points(self, points: Sequence[Point] | np.ndarray):
+        if self._channel:
+            ps = np.asarray(points, dtype=float).reshape(-1, 2)
+            self._bridge.extend_points.emit(encode_float64(ps[:, 0]), encode_float64(ps[:, 1]))
+        else:
+            self.runJavaScript(
+                f"extendPoints({json.dumps([p[0] for p in points])}, {json.dumps([p[1] for p in points])})")
+
+    def select_point(self, index: int | None, restyle: bool = False):
+        if self._channel:
+            signal = self._bridge.select_point_restyle if restyle else self._bridge.select_point
+            signal.emit(index if isinstance(index, int) else -1)
+        else:
+            self.runJavaScript(
+                f"{'selectPointRestyle' if restyle else 'selectPoint'}({index if isinstance(index, int) else 'null'})"
+            )
 
 
 class DevToolsWindow(QMainWindow):
@@ -0,0 +1,7 @@
+import base64
+
+import numpy as np
+
+
+def encode_float64(values) -> str:
+    return base64.b64encode(np.asarray(values, dtype='<f8').tobytes()).decode('ascii')
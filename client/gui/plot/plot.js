@@ -171,11 +171,23 @@ export function setPoints(xs, ys) {
     plot_points_data.x = xs
     plot_points_data.y = ys
     plot_points_data.marker.color = Array(xs.length).fill(COLOR.point)
+    selected_point = null
 }
 
 window.setPoints = setPoints
 
 
+export function extendPoints(xs, ys) {
+    Plotly.extendTraces(
+        PLOT_ID,
+        {x: [xs], y: [ys], 'marker.color': [Array(xs.length).fill(COLOR.point)]},
+        [plot_data.indexOf(plot_points_data)]
+    )
+}
+
+window.extendPoints = extendPoints
+
+
 export function selectPoint(index) {
     let color = plot_points_data.marker.color
     if (selected_point !== null)
@@ -188,5 +200,47 @@ export function selectPoint(index) {
 window.selectPoint = selectPoint
 
 
+export function selectPointRestyle(index) {
+    selectPoint(index)
+    Plotly.restyle(
+        PLOT_ID,
+        {'marker.color': [plot_points_data.marker.color]},
+        [plot_data.indexOf(plot_points_data)]
+    )
+}
+
+window.selectPointRestyle = selectPointRestyle
+
+
+export function decodeFloat64(data) {
+    const binary = atob(data)
+    const bytes = new Uint8Array(binary.length)
+    for (let i = 0; i < binary.length; i++)
+        bytes[i] = binary.charCodeAt(i)
+    return new Float64Array(bytes.buffer)
+}
+
+
+export function initChannel() {
+    new QWebChannel(qt.webChannelTransport, function (channel) {
+        let bridge = channel.objects.bridge
+        bridge.reset_data.connect(resetPlotData)
+        bridge.update_plot.connect(updatePlot)
+        bridge.set_function_plot.connect((xs, ys) => setFunctionPlot(decodeFloat64(xs), decodeFloat64(ys)))
+        bridge.set_rect.connect(setRect)
+        bridge.set_rect_fill.connect(setRectFill)
+        bridge.add_point.connect(addPoint)
+        bridge.set_points.connect(
+            (xs, ys) => setPoints(Array.from(decodeFloat64(xs)), Array.from(decodeFloat64(ys))))
+        bridge.extend_points.connect(
+            (xs, ys) => extendPoints(Array.from(decodeFloat64(xs)), Array.from(decodeFloat64(ys))))
+        bridge.select_point.connect((index) => selectPoint(index >= 0 ? index : null))
+        bridge.select_point_restyle.connect((index) => selectPointRestyle(index >= 0 ? index : null))
+        bridge.set_ready()
+    })
+}
+
+
 document.addEventListener('DOMContentLoaded', initPlot)
+document.addEventListener('DOMContentLoaded', initChannel)
 // document.addEventListener('DOMContentLoaded', test)
@@ -0,0 +1,59 @@
+import numpy as np
+
+from common.bounds import ArrayFunction
+
+
+def _scale(ys: np.ndarray) -> float:
+    finite = ys[np.isfinite(ys)]
+    if not finite.size:
+        return 1.0
+    low, high = np.quantile(finite, (0.02, 0.98))
+    return float(high - low) or max(1.0, float(np.abs(finite).max()))
+
+
+def _refinement(f: ArrayFunction, xs: np.ndarray, ys: np.ndarray, tolerance: float) -> tuple[np.ndarray, np.ndarray,
+                                                                                           np.ndarray]:
+    mid_xs = (xs[:-1] + xs[1:]) / 2
+    mid_ys = f(mid_xs)
+    left, right = ys[:-1], ys[1:]
+    finite = np.isfinite(left), np.isfinite(mid_ys), np.isfinite(right)
+    with np.errstate(all='ignore'):
+        deviation = np.abs(mid_ys - (left + right) / 2)
+    refine = (finite[0] != finite[1]) | (finite[1] != finite[2])
+    refine |= finite[0] & finite[1] & finite[2] & (deviation > tolerance)
+    return refine, mid_xs, mid_ys
+
+
+def sample_adaptive(f: ArrayFunction, start: float, end: float, n: int, height: int,
+                    depth: int = 10, max_points: int | None = None, jump: float = 1.0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Samples f on [start, end] starting from n uniform segments and bisecting those which deviate from the straight
+    line between their ends by more than a pixel of a plot `height` pixels high.
+    Segments still unresolved after `depth` bisections, jumping by more than `jump` plot heights and not monotone
+    inside are considered discontinuities and separated with NaN, as are non-finite values.
+    """
+    max_points = max_points if max_points is not None else n * 16
+    xs = np.linspace(start, end, n + 1)
+    ys = np.asarray(f(xs), dtype=float)
+    span = _scale(ys)
+    tolerance = span / max(height, 1)
+
+    for _ in range(depth):
+        refine, mid_xs, mid_ys = _refinement(f, xs, ys, tolerance)
+        if not refine.any() or len(xs) + refine.sum() > max_points:
+            break
+        where = np.flatnonzero(refine) + 1
+        xs = np.insert(xs, where, mid_xs[refine])
+        ys = np.insert(ys, where, mid_ys[refine])
+    else:
+        refine, mid_xs, mid_ys = _refinement(f, xs, ys, tolerance)
+
+    left, right = ys[:-1], ys[1:]
+    with np.errstate(all='ignore'):
+        monotone = (np.minimum(left, right) <= mid_ys) & (mid_ys <= np.maximum(left, right))
+        breaks = refine & ~monotone & (np.abs(right - left) > span * jump)
+    where = np.flatnonzero(breaks) + 1
+    xs = np.insert(xs, where, (xs[where - 1] + xs[where]) / 2)
+    ys = np.insert(ys, where, np.nan)
+    ys[~np.isfinite(ys)] = np.nan
+    return xs, ys
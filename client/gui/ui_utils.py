@@ -1,21 +1,56 @@
+import hashlib
 import logging
-import subprocess
 import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from client.utils import PATH
 
+STAMP_EXT = '.stamp'
+
+
+def _ui_hash(path: str) -> str:
+    with open(path, mode='rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _is_compiled(py_path: str, digest: str) -> bool:
+    try:
+        with open(py_path + STAMP_EXT, mode='r') as f:
+            return f.read().strip() == digest and os.path.isfile(py_path)
+    except OSError:
+        return False
+
+
+def _compile(ui_path: str, py_path: str, digest: str):
+    class_name = os.path.splitext(os.path.basename(py_path))[0]
+    logging.getLogger('client.meta').info(f'Compiling ui class {class_name}')
+    proc = subprocess.run(['pyside6-uic', ui_path], capture_output=True, check=True)
+    with open(py_path, mode='wb') as f:
+        f.write(proc.stdout)
+    with open(py_path + STAMP_EXT, mode='w') as f:
+        f.write(digest)
+
 
-def compile_ui():
+def compile_ui(force: bool = False):
+    log = logging.getLogger('client.meta')
+    start = time.perf_counter()
+    jobs = []
     for i in os.scandir(PATH.UI):
         i: os.DirEntry
         if i.name.lower().endswith('.ui'):
-            proc = subprocess.run(['pyside6-uic', i.path], capture_output=True, check=True)
-            path, _ = os.path.splitext(i.path)
-            class_name = os.path.basename(path)
-            logging.getLogger('client.meta').info(f'Compiling ui class {class_name}')
-            with open(PATH.get(''.join((class_name, '.py')), mode='UI'), mode='wb') as f:
-                f.write(proc.stdout)
+            class_name = os.path.splitext(i.name)[0]
+            py_path = PATH.get(''.join((class_name, '.py')), mode='UI')
+            digest = _ui_hash(i.path)
+            if force or not _is_compiled(py_path, digest):
+                jobs.append((i.path, py_path, digest))
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+            for future in [executor.submit(_compile, *job) for job in jobs]:
+                future.result()
+    log.info(f'Compiled {len(jobs)} ui files in {time.perf_counter() - start:.3f}s.')
 
 
 if __name__ == '__main__':
-    compile_ui()
+    compile_ui(force=True)
@@ -57,16 +57,23 @@ def _test(mw):
     state = tw._task_session.state
     area = (state.int_x[1] - state.int_x[0]) * (state.int_y[1] - state.int_y[0])
     area_neg = (state.int_x[1] - state.int_x[0]) * max(0.0, -state.int_y[0])
-    tw.inputIntResult.setValue(area * (sum(state.point_hits) / len(state.points)) - area_neg)
+    tw.inputIntResult.setValue(area * state.point_buffer.hit_ratio - area_neg)
     tw.buttonIntComplete.click()
 
 
-def run_client(task_batch_file: str | None = None, delimiter: str | None = None, test: bool = False):
+def run_client(task_batch_file: str | None = None, delimiter: str | None = None, test: bool = False,
+               plot: str | None = None, log_json: bool = False, profile: bool = False):
+    from common.utils import STATE as COMMON_STATE
+    COMMON_STATE.LOG_JSON = log_json
+
     import client.log
     import logging
     try:
         from client.utils import STATE, PATH
 
+        if plot is not None:
+            STATE.PLOT_BACKEND = plot
+        STATE.PROFILE = profile
         STATE.log_debug()
         PATH.log_debug()
 
@@ -75,9 +82,18 @@ def run_client(task_batch_file: str | None = None, delimiter: str | None = None,
 
         install()
 
+        from client.task.Task import Task
+        from client.task.TaskDiskCache import TaskDiskCache
+        Task.disk_cache = TaskDiskCache(PATH.CACHE)
+        from client.task.ActionProfiler import PROFILER
+        PROFILER.enabled = STATE.PROFILE
+
+        from PySide6.QtCore import Qt
         from PySide6.QtWidgets import QApplication
         from client.gui.MainWindow import MainWindow, DownloaderMainWindow
 
+        # QtWebEngine is imported lazily, after application is created.
+        QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
         app = QApplication([])
 
         from client.gui.ErrorDialog import ErrorDialog
@@ -91,8 +107,8 @@ def run_client(task_batch_file: str | None = None, delimiter: str | None = None,
         raise
 
     if task_batch_file is not None:
-        from common.TaskBatch import read_task_batch
-        with open(task_batch_file, mode='r', encoding='utf-8') as f:
+        from common.TaskBatch import open_task_batch, read_task_batch
+        with open_task_batch(task_batch_file) as f:
             batch = read_task_batch(f, **dict(delimiter=delimiter) if delimiter is not None else dict())
     else:
         batch = None
@@ -101,6 +117,7 @@ def run_client(task_batch_file: str | None = None, delimiter: str | None = None,
         mw = MainWindow()
         mw.choice_widget.set_task_batch(batch)
         mw.show()
+        mw.resume_task()
     else:
         mw = DownloaderMainWindow()
         mw.choice_widget.set_task_displayed(False)
@@ -113,6 +130,12 @@ def run_client(task_batch_file: str | None = None, delimiter: str | None = None,
 
     app.exec()
 
+    if STATE.PROFILE:
+        try:
+            PROFILER.save_csv(PATH.PROFILE)
+        except OSError:
+            logging.getLogger('client.app').exception(f"Failed saving action times \"{PATH.PROFILE}\".")
+
 
 def run_cmd_client(*args):
     import common.exceptions
@@ -128,20 +151,34 @@ def run_cmd_client(*args):
     )
     f = parser.add_argument(
         '-f', '--file', type=argparse.FileType(mode='r'),
-        help='Load tasks batch from .csv file so user have to choose name instead of entering task parameters.')
+        help='Load tasks batch from .csv (or gzip-compressed .csv.gz) file'
+             ' so user have to choose name instead of entering task parameters.')
     d = parser.add_argument(
         '-d', '--delimiter',
         help='.csv file delimiter (-f required).')
+    parser.add_argument(
+        '-p', '--plot', choices=CONST.PLOT_BACKENDS,
+        help='Plot backend: "web" draws with Plotly in QtWebEngine (default),'
+             ' "native" draws with QPainter and needs much less memory.')
+    parser.add_argument(
+        '--log-json', action='store_true',
+        help='Write log file as JSON lines instead of plain text.')
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='Record time histograms of actions, open them with Ctrl+Shift+P, saved to profile.csv on exit.')
 
     options = parser.parse_args(args)
 
     if options.delimiter is not None and options.file is None:
         raise argparse.ArgumentError(d, 'file should be specified for delimiter to have effect.')
 
-    run_client(None if not options.file else options.file.name, delimiter=options.delimiter)
+    run_client(None if not options.file else options.file.name, delimiter=options.delimiter, plot=options.plot,
+               log_json=options.log_json, profile=options.profile)
 
 
 if __name__ == '__main__':
+    import multiprocessing
     import sys
 
+    multiprocessing.freeze_support()
     run_cmd_client(*sys.argv[1:])
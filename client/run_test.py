@@ -2,4 +2,7 @@ from client.main import run_client
 
 
 if __name__ == '__main__':
+    import multiprocessing
+
+    multiprocessing.freeze_support()
     run_client(test=True)
@@ -0,0 +1,110 @@
+import csv
+import time
+from bisect import bisect_left
+from enum import Flag
+from typing import IO, NamedTuple
+
+# Upper bucket edges in milliseconds, the last bucket is open.
+BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LatencyKey(NamedTuple):
+    kind: str
+    name: str
+
+
+class LatencyHistogram:
+    """
+    Counts of measured times per fixed bucket, with their total and maximum.
+    """
+    __slots__ = ('counts', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0
+        self.max = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def mean(self) -> float:
+        """
+        :return: Mean time in milliseconds.
+        """
+        return self.total / self.count / 1e6 if self.count else 0.
+
+    def add(self, ns: int):
+        self.counts[bisect_left(BUCKETS, ns / 1e6)] += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+
+class ActionProfiler:
+    """
+    Opt-in wall time histograms of graded session actions, their errors, widget handlers and plot updates.
+    While disabled, instrumented calls only check the flag.
+    """
+    ACTION = 'action'
+    ERROR = 'error'
+    WIDGET = 'widget'
+    PLOT = 'plot'
+
+    def __init__(self):
+        self.enabled = False
+        self._histograms: dict[LatencyKey, LatencyHistogram] = {}
+
+    @staticmethod
+    def flag_name(flag: Flag) -> str:
+        return flag.name if flag.name is not None else str(flag.value)
+
+    def start(self) -> int | None:
+        """
+        :return: Start time to pass to stop, None if disabled.
+        """
+        return time.perf_counter_ns() if self.enabled else None
+
+    def stop(self, start: int | None, kind: str, name: str):
+        if start is not None:
+            self.record(kind, name, time.perf_counter_ns() - start)
+
+    def record(self, kind: str, name: str, ns: int):
+        key = LatencyKey(kind, name)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = LatencyHistogram()
+        histogram.add(ns)
+
+    @property
+    def histograms(self) -> dict[LatencyKey, LatencyHistogram]:
+        return dict(sorted(self._histograms.items()))
+
+    def reset(self):
+        self._histograms.clear()
+
+    @staticmethod
+    def header() -> list[str]:
+        return ['kind', 'name', 'count', 'mean_ms', 'max_ms', 'total_ms',
+                *(f'<={edge}ms' for edge in BUCKETS), f'>{BUCKETS[-1]}ms']
+
+    def rows(self) -> list[list]:
+        return [[key.kind, key.name, h.count, round(h.mean, 3), round(h.max / 1e6, 3), round(h.total / 1e6, 3),
+                 *h.counts]
+                for key, h in self.histograms.items()]
+
+    def write_csv(self, f: IO[str]):
+        writer = csv.writer(f)
+        writer.writerow(self.header())
+        writer.writerows(self.rows())
+
+    def save_csv(self, path: str):
+        with open(path, mode='w', encoding='utf-8', newline='') as f:
+            self.write_csv(f)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(enabled={self.enabled}, keys={len(self._histograms)})"
+
+
+PROFILER = ActionProfiler()
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Iterator, NamedTuple
+
+
+class CachedDownload(NamedTuple):
+    url: str
+    etag: str | None
+    last_modified: str | None
+    time: float
+    size: int
+    digest: str
+    path: str
+
+
+class DownloadWriter:
+    """
+    Writes downloaded content to a temporary file, which replaces cache entry on commit.
+    """
+
+    def __init__(self, cache: 'DownloadCache', url: str):
+        self._cache = cache
+        self._url = url
+        self._path = cache.path(url)
+        self._tmp = f"{self._path}.{os.getpid()}.tmp"
+        self._hash = hashlib.sha256()
+        self._size = 0
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            self._file = open(self._tmp, mode='wb')
+        except OSError:
+            logging.getLogger('client.app').warning(f"{cache} failed writing \"{self._tmp}\".", exc_info=True)
+            self._file = None
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    def write(self, data: bytes):
+        self._hash.update(data)
+        self._size += len(data)
+        if self._file is not None:
+            try:
+                self._file.write(data)
+            except OSError:
+                logging.getLogger('client.app').warning(f"{self._cache} failed writing \"{self._tmp}\".",
+                                                        exc_info=True)
+                self.abort()
+
+    def commit(self, etag: str | None = None, last_modified: str | None = None) -> CachedDownload:
+        entry = CachedDownload(self._url, etag, last_modified, time.time(), self._size, self.digest, self._path)
+        if self._file is None:
+            return entry
+        meta_path = self._cache.meta_path(self._url)
+        try:
+            self._file.close()
+            self._file = None
+            # Entry without metadata is invalid, so a crash between replacements can not pair it with stale validators.
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            os.replace(self._tmp, self._path)
+            with open(meta_path + '.tmp', mode='w', encoding='utf-8') as f:
+                json.dump({'url': entry.url, 'etag': etag, 'last_modified': last_modified, 'time': entry.time,
+                           'size': entry.size, 'digest': entry.digest}, f)
+            os.replace(meta_path + '.tmp', meta_path)
+        except OSError:
+            logging.getLogger('client.app').warning(f"{self._cache} failed writing \"{self._path}\".", exc_info=True)
+        return entry
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            try:
+                os.remove(self._tmp)
+            except OSError:
+                pass
+
+
+class DownloadCache:
+    """
+    Last successfully downloaded content per url with its validators, for conditional requests and offline use.
+    Each entry is a content file and a JSON metadata file written after it.
+    """
+    EXT = '.cache'
+    META_EXT = '.json'
+    CHUNK = 64 * 1024
+
+    def __init__(self, root: str):
+        self._root = root
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def path(self, url: str) -> str:
+        return os.path.join(self._root, self.key(url) + self.EXT)
+
+    def meta_path(self, url: str) -> str:
+        return os.path.join(self._root, self.key(url) + self.META_EXT)
+
+    def load(self, url: str) -> CachedDownload | None:
+        path = self.meta_path(url)
+        try:
+            with open(path, mode='r', encoding='utf-8') as f:
+                meta = json.load(f)
+            entry = CachedDownload(url, meta['etag'], meta['last_modified'], meta['time'], meta['size'],
+                                   meta['digest'], self.path(url))
+            size = os.path.getsize(entry.path)
+            if meta['url'] != url or size != entry.size:
+                raise ValueError(f"Cache entry of \"{meta['url']}\" has {size} of {entry.size} bytes.")
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            logging.getLogger('client.app').warning(f"{self} failed loading \"{path}\", discarding.", exc_info=True)
+            return None
+
+    def read(self, entry: CachedDownload, chunk: int = CHUNK) -> Iterator[bytes]:
+        with open(entry.path, mode='rb') as f:
+            while data := f.read(chunk):
+                yield data
+
+    def writer(self, url: str) -> DownloadWriter:
+        return DownloadWriter(self, url)
+
+    def discard(self, url: str):
+        for path in (self.meta_path(url), self.path(url)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._root})"
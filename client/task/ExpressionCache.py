@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import collections
+import dataclasses
+import threading
+from typing import TYPE_CHECKING, Callable, NamedTuple
+
+if TYPE_CHECKING:
+    import sympy
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledExpression:
+    expr: sympy.Expr
+    sym: sympy.Symbol
+    f_eval: Callable
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class ExpressionCache:
+
+    def __init__(self, maxsize: int = 256):
+        self._maxsize = maxsize
+        self._data: collections.OrderedDict[tuple[str, str], CompiledExpression] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(f: str | sympy.Expr) -> tuple[str, str]:
+        if isinstance(f, str):
+            return 'str', ' '.join(f.split())
+        else:
+            import sympy
+            return 'srepr', sympy.srepr(f)
+
+    def get(self, f: str | sympy.Expr, compile_: Callable[[str | sympy.Expr], CompiledExpression]) -> CompiledExpression:
+        key = self.key(f)
+        with self._lock:
+            compiled = self._data.get(key)
+            if compiled is not None:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return compiled
+            self._misses += 1
+        compiled = compile_(f)
+        with self._lock:
+            self._data[key] = compiled
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, len(self._data), self._maxsize)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.info()})"
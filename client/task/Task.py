@@ -1,19 +1,68 @@
-import sympy
-from sympy.parsing.sympy_parser import *
+from __future__ import annotations
 
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+from client.task.TaskDiskCache import TaskDiskCache
+from client.task.ExpressionCache import CacheInfo, CompiledExpression, ExpressionCache
+from common.bounds import ArrayFunction, FunctionRange, eval_array, scan_range
 from common.exceptions import AppError
 from common.task.const import Interval
 
+if TYPE_CHECKING:
+    import sympy
+
 Function = Callable[[float], float]
 
 
 class Task:
-    _parser_transformations = standard_transformations + (split_symbols, implicit_multiplication, convert_xor)
+    _cache = ExpressionCache()
+    disk_cache: TaskDiskCache | None = None
+    MEMORY_ARTIFACTS = 16
 
     def __init__(self, f: str | sympy.Expr, interval: Interval, min_points: int, error: float, confidence: float):
+        self._interval = tuple(interval)  # TODO Comparison
+        self._f_input = f if isinstance(f, str) else str(f)
+        self._f_source = f if isinstance(f, str) else self._srepr(f)
+        self._f_srepr = None if isinstance(f, str) else self._f_source
+        self._artifacts: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._stored: dict[str, np.ndarray] | None = None
+        compiled = self._cache.get(f, self._compile_stored)
+        self._f_expr = compiled.expr
+        self._f_sym = compiled.sym
+        self._f_eval = compiled.f_eval
+        if self._interval[1] <= self._interval[0]:
+            raise NotImplementedError(f"{self} right-to-left and zero-width intervals are not supported.")
+        self._min_points = min_points
+        self._error = error
+        self._confidence = confidence
+
+    @staticmethod
+    def preload():
+        """
+        Imports sympy ahead of first use, meant to be called from a background thread.
+        """
+        import sympy.parsing.sympy_parser
+
+    @staticmethod
+    def _srepr(f: sympy.Expr) -> str:
+        import sympy
+        return sympy.srepr(f)
+
+    @staticmethod
+    def _parser_transformations() -> tuple:
+        from sympy.parsing.sympy_parser import (
+            standard_transformations, split_symbols, implicit_multiplication, convert_xor)
+        return standard_transformations + (split_symbols, implicit_multiplication, convert_xor)
+
+    @classmethod
+    def _compile(cls, f: str | sympy.Expr) -> CompiledExpression:
+        import sympy
         try:
             if not isinstance(f, sympy.Expr):
-                f = sympy.parse_expr(f, evaluate=False, transformations=self._parser_transformations)
+                f = sympy.parse_expr(f, evaluate=False, transformations=cls._parser_transformations())
             else:
                 ...
         except ValueError or SyntaxError as e:
@@ -21,15 +70,56 @@ class Task:
         f: sympy.Expr
         if len(f.free_symbols) > 1:
             raise AppError(f"Слишком много переменных (\"{f.free_symbols}\") в выражении \"{f}\".")
-        self._f_expr = f
-        self._f_sym = f.free_symbols.pop() if f.free_symbols else sympy.Symbol('x')
-        self._f_eval = sympy.lambdify(self._f_sym, f)
-        self._interval = tuple(interval)  # TODO Comparison
-        if self._interval[1] <= self._interval[0]:
-            raise NotImplementedError(f"{self} right-to-left and zero-width intervals are not supported.")
-        self._min_points = min_points
-        self._error = error
-        self._confidence = confidence
+        sym = f.free_symbols.pop() if f.free_symbols else sympy.Symbol('x')
+        return CompiledExpression(f, sym, sympy.lambdify(sym, f))
+
+    def _compile_stored(self, f: str | sympy.Expr) -> CompiledExpression:
+        """
+        Rebuilds expression from srepr stored in disk cache, which skips parsing, compiles it otherwise.
+        """
+        if not isinstance(f, str) or self.disk_cache is None:
+            return self._compile(f)
+        self._stored = self.disk_cache.load(self._disk_key())
+        if 'srepr' in self._stored:
+            srepr = self._stored['srepr'].item()
+            expr = self._from_srepr(srepr)
+            if expr is not None:
+                self._f_srepr = srepr
+                return self._compile(expr)
+            self._stored = {}
+        return self._compile(f)
+
+    @staticmethod
+    def _from_srepr(srepr: str) -> sympy.Expr | None:
+        """
+        :return: Expression evaluated from srepr written by this application, None if it does not reproduce srepr.
+        """
+        import sympy
+        try:
+            with sympy.evaluate(False):
+                expr = eval(srepr, {'__builtins__': {}}, vars(sympy))
+        except Exception:
+            return None
+        return expr if isinstance(expr, sympy.Expr) and sympy.srepr(expr) == srepr else None
+
+    @classmethod
+    def compile(cls, f: str | sympy.Expr) -> CompiledExpression:
+        """
+        :return: Parsed expression and its callable, shared with tasks created from the same expression.
+        """
+        return cls._cache.get(f, cls._compile)
+
+    @classmethod
+    def cache_info(cls) -> CacheInfo:
+        return cls._cache.info()
+
+    @property
+    def f_source(self) -> str:
+        """
+        :return: Expression string the task was created from, printed expression if created from sympy expression.
+        Printed form does not always parse back to the same expression, so it is the source that is recorded.
+        """
+        return self._f_input
 
     @property
     def f_expr(self) -> sympy.Expr:
@@ -42,6 +132,21 @@ class Task:
     def f(self) -> Function:
         return self.f_call
 
+    def f_array_call(self, xs: np.ndarray) -> np.ndarray:
+        return eval_array(self._f_eval, np.asarray(xs, dtype=float), self.f_call)
+
+    @property
+    def f_array(self) -> ArrayFunction:
+        return self.f_array_call
+
+    def f_range(self, resolution: int, interval: Interval | None = None) -> FunctionRange:
+        start, end = self._interval if interval is None else interval
+        xs = np.linspace(start, end, resolution + 1)
+        f_range = scan_range(self.f_array_call, xs)
+        if f_range is None:
+            raise AppError(f"Функция \"{self._f_expr}\" не определена на интервале {(start, end)}.")
+        return f_range
+
     @property
     def interval(self) -> Interval:
         return self._interval
@@ -58,20 +163,61 @@ class Task:
     def confidence(self) -> float:
         return self._confidence
 
+    @property
+    def f_srepr(self) -> str:
+        if self._f_srepr is None:
+            self._f_srepr = self._srepr(self._f_expr)
+        return self._f_srepr
+
+    def artifact(self, name: str, compute: Callable[[], np.ndarray | tuple | str], persist: bool = False) \
+            -> np.ndarray:
+        """
+        :param persist: Store in disk cache, along with srepr the expression is rebuilt from on next launch.
+            Others are kept in memory, last MEMORY_ARTIFACTS used of them.
+        """
+        if persist and self.disk_cache is not None:
+            return self._stored_artifact(name, compute)
+        if name in self._artifacts:
+            self._artifacts.move_to_end(name)
+        else:
+            self._artifacts[name] = np.asarray(compute())
+            if len(self._artifacts) > self.MEMORY_ARTIFACTS:
+                self._artifacts.popitem(last=False)
+        return self._artifacts[name]
+
+    def _disk_key(self) -> str:
+        return TaskDiskCache.key(self._f_source, self._interval)
+
+    def _stored_artifact(self, name: str, compute: Callable[[], np.ndarray | tuple | str]) -> np.ndarray:
+        key = self._disk_key()
+        if self._stored is None:
+            self._stored = self.disk_cache.load(key)
+            if 'srepr' in self._stored and self._stored['srepr'].item() != self.f_srepr:
+                self._stored = {}
+        if name not in self._stored:
+            value = np.asarray(compute())
+            self._stored[name] = value
+            self.disk_cache.update(key, **{name: value, 'srepr': np.asarray(self.f_srepr)})
+        return self._stored[name]
+
+    def _integral(self):
+        import sympy
+        return sympy.Integral(self._f_expr, (self._f_sym, *self._interval))
+
+    @staticmethod
+    def _pretty(expr: sympy.Basic, use_unicode: bool) -> str:
+        import sympy
+        return sympy.pretty(expr, use_unicode=use_unicode)
+
     def f_str(self):
-        return sympy.pretty(self._f_expr, use_unicode=False)
+        return self.artifact('f_str', lambda: self._pretty(self._f_expr, use_unicode=False), persist=True).item()
 
     def str(self):
-        return sympy.pretty(
-            sympy.Integral(self._f_expr,
-                           (self._f_sym, *self._interval)),
-            use_unicode=False)
+        return self.artifact('str', lambda: self._pretty(self._integral(), use_unicode=False), persist=True).item()
 
     def f_unicode_str(self):
-        return sympy.pretty(self._f_expr, use_unicode=True)
+        return self.artifact('f_unicode_str', lambda: self._pretty(self._f_expr, use_unicode=True), persist=True).item()
 
     def unicode_str(self):
-        return sympy.pretty(
-            sympy.Integral(self._f_expr,
-                           (self._f_sym, *self._interval)),
-            use_unicode=True)
+        return self.artifact('unicode_str', lambda: self._pretty(self._integral(), use_unicode=True),
+                             persist=True).item()
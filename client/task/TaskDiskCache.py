@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from common.task.const import Interval
+from common.utils import CONST
+
+
+class TaskDiskCache:
+    VERSION = 1
+    EXT = '.npz'
+    MAX_BYTES = 16 * 2 ** 20
+
+    def __init__(self, root: str):
+        self._root = root
+        self._dir = os.path.join(root, self.version_tag())
+        self._lock = threading.Lock()
+        self._pruned = False
+
+    @property
+    def root(self) -> str:
+        return self._root
+
+    @classmethod
+    def version_tag(cls) -> str:
+        import sympy
+        version = f"{CONST.BASE_NAME}-{cls.VERSION}-sympy{sympy.__version__}-numpy{np.__version__}"
+        return hashlib.sha1(version.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def key(f: str, interval: Interval) -> str:
+        source = f"{' '.join(f.split())}\n{float(interval[0])!r}\n{float(interval[1])!r}"
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._dir, key + self.EXT)
+
+    def _prune(self):
+        """
+        Removes cache directories of other versions.
+        """
+        if self._pruned:
+            return
+        self._pruned = True
+        if not os.path.isdir(self._root):
+            return
+        for e in os.scandir(self._root):
+            if e.is_dir() and e.path != self._dir:
+                shutil.rmtree(e.path, ignore_errors=True)
+
+    def load(self, key: str) -> dict[str, np.ndarray]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                res = {k: data[k] for k in data.files}
+            # Modification time orders entries by last use for eviction.
+            os.utime(path)
+            return res
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logging.getLogger('client.app').warning(f"{self} failed loading \"{path}\", discarding.", exc_info=True)
+            return {}
+
+    def update(self, key: str, **arrays: np.ndarray):
+        path = self._path(key)
+        with self._lock:
+            try:
+                self._prune()
+                os.makedirs(self._dir, exist_ok=True)
+                data = self.load(key)
+                data.update(arrays)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, mode='wb') as f:
+                    np.savez_compressed(f, **data)
+                os.replace(tmp, path)
+                self._evict()
+            except OSError:
+                logging.getLogger('client.app').warning(f"{self} failed writing \"{path}\".", exc_info=True)
+
+    def _evict(self):
+        """
+        Removes least recently used entries while cache exceeds MAX_BYTES.
+        """
+        entries = []
+        for e in os.scandir(self._dir):
+            # Precompiling workers write to the same directory and may remove entries meanwhile.
+            try:
+                if e.name.endswith(self.EXT):
+                    entries.append((e.stat().st_mtime, e.stat().st_size, e.path))
+            except FileNotFoundError:
+                pass
+        size = sum(e[1] for e in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self._dir, ignore_errors=True)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._dir})"
@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import struct
+import zlib
+from typing import BinaryIO, NamedTuple
+
+import numpy as np
+
+from common.exceptions import AppError
+from common.task.const import STEP, Interval
+from common.task.data import PointBuffer, TaskState, TaskStats
+from common.task.events import EVENT_DTYPE, EventLog
+from common.task.record import RecordTaskTuple
+
+from client.task.TaskSession import TaskSession
+
+
+class JournalSnapshot(NamedTuple):
+    events: int
+    step: STEP
+    int_x: Interval | None
+    int_y: Interval | None
+    result: float | None
+    error: int | None
+    step_time: dict[STEP, float]
+    points: np.ndarray
+    hits: np.ndarray
+
+
+class JournalContent(NamedTuple):
+    name: str | None
+    task: RecordTaskTuple
+    events: np.ndarray
+    objects: dict[int, tuple[tuple, dict]]
+    snapshot: JournalSnapshot | None
+    size: int
+    srepr: str
+
+
+def _to_tuple(value):
+    return tuple(map(_to_tuple, value)) if isinstance(value, list) else value
+
+
+class TaskJournal:
+    """
+    Append-only binary journal of a running session.
+    Each recorded action or error is written and flushed as soon as it happens,
+    state snapshots are written periodically and on step changes, so that resume replays only the tail.
+
+    File is a header followed by frames of kind, payload length, payload and payload crc32.
+    A torn frame at the end of file is ignored.
+    Header frame holds task with its expression source and the parsed expression srepr,
+    so that a session is not resumed against a task parsed differently.
+    """
+    MAGIC = b'MCTJ'
+    VERSION = 2
+    HEADER, EVENT, SNAPSHOT = range(3)
+    SNAPSHOT_INTERVAL = 256
+
+    _VERSION = struct.Struct('<H')
+    _FRAME = struct.Struct('<BI')
+    _CRC = struct.Struct('<I')
+    _META = struct.Struct('<I')
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self._since_snapshot = 0
+
+    @classmethod
+    def create(cls, path: str, name: str | None, task: RecordTaskTuple, srepr: str) -> 'TaskJournal':
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        journal = cls(open(path, mode='wb'))
+        journal._file.write(cls.MAGIC + cls._VERSION.pack(cls.VERSION))
+        journal._write(cls.HEADER, json.dumps({'name': name, 'task': list(task), 'srepr': srepr},
+                                              ensure_ascii=False).encode('utf-8'))
+        return journal
+
+    @classmethod
+    def resume(cls, path: str, session: TaskSession) -> 'TaskJournal':
+        """
+        Restores session from journal and continues writing it.
+        """
+        content = cls.read(path)
+        if content.srepr != session.task.f_srepr:
+            raise AppError(f"Задание журнала сессии \"{path}\" не совпадает с восстановленным заданием.")
+        cls.restore(content, session)
+        file = open(path, mode='r+b')
+        file.truncate(content.size)
+        file.seek(content.size)
+        journal = cls(file)
+        session.set_journal(journal)
+        journal.write_snapshot(session.state, session.stats)
+        return journal
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.isfile(path)
+
+    @staticmethod
+    def discard(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logging.getLogger('client.app').warning(f"Failed removing session journal \"{path}\".", exc_info=True)
+
+    def close(self):
+        self._file.close()
+
+    def _write(self, kind: int, payload: bytes):
+        self._file.write(self._FRAME.pack(kind, len(payload)) + payload + self._CRC.pack(zlib.crc32(payload)))
+        self._file.flush()
+
+    def write_event(self, stats: TaskStats, index: int):
+        events = stats.events
+        row = events.data[index]
+        payload = row.tobytes()
+        if row['n_args'] < 0:
+            args, kwargs = events.arguments(index)
+            payload += json.dumps([args, kwargs], ensure_ascii=False).encode('utf-8')
+        self._write(self.EVENT, payload)
+        self._since_snapshot += 1
+
+    def checkpoint(self, state: TaskState, stats: TaskStats, force: bool = False):
+        if force or self._since_snapshot >= self.SNAPSHOT_INTERVAL:
+            self.write_snapshot(state, stats)
+
+    def write_snapshot(self, state: TaskState, stats: TaskStats):
+        buffer = state.point_buffer
+        meta = json.dumps({
+            'events': len(stats.events),
+            'step': int(state.step),
+            'int_x': state.int_x,
+            'int_y': state.int_y,
+            'result': state.result,
+            'error': state.error,
+            'step_time': {int(k): v for k, v in stats.step_time.items()},
+            'points': len(buffer),
+            'counted': buffer.counted,
+        }).encode('utf-8')
+        self._write(self.SNAPSHOT, self._META.pack(len(meta)) + meta +
+                    np.ascontiguousarray(buffer.points, dtype='<f8').tobytes() + buffer.hits.tobytes())
+        os.fsync(self._file.fileno())
+        self._since_snapshot = 0
+
+    @classmethod
+    def _read_snapshot(cls, payload: bytes) -> JournalSnapshot:
+        n = cls._META.unpack_from(payload)[0]
+        offset = cls._META.size + n
+        meta = json.loads(payload[cls._META.size:offset])
+        points = np.frombuffer(payload, dtype='<f8', count=2 * meta['points'], offset=offset).reshape(-1, 2)
+        hits = np.frombuffer(payload, dtype=bool, count=meta['counted'], offset=offset + points.nbytes)
+        return JournalSnapshot(
+            meta['events'], STEP(meta['step']), _to_tuple(meta['int_x']), _to_tuple(meta['int_y']), meta['result'],
+            meta['error'], {STEP(int(k)): v for k, v in meta['step_time'].items()}, points, hits
+        )
+
+    @classmethod
+    def read(cls, path: str) -> JournalContent:
+        with open(path, mode='rb') as f:
+            data = f.read()
+        offset = len(cls.MAGIC) + cls._VERSION.size
+        if data[:len(cls.MAGIC)] != cls.MAGIC or len(data) < offset \
+                or cls._VERSION.unpack_from(data, len(cls.MAGIC))[0] != cls.VERSION:
+            raise AppError(f"Файл \"{path}\" не является журналом сессии поддерживаемой версии.")
+
+        header = None
+        rows = []
+        objects = {}
+        snapshot_payload = None
+        while offset + cls._FRAME.size <= len(data):
+            kind, length = cls._FRAME.unpack_from(data, offset)
+            start = offset + cls._FRAME.size
+            end = start + length
+            if end + cls._CRC.size > len(data):
+                break
+            payload = data[start:end]
+            if cls._CRC.unpack_from(data, end)[0] != zlib.crc32(payload):
+                break
+            if kind == cls.HEADER:
+                header = json.loads(payload)
+            elif kind == cls.EVENT:
+                row = payload[:EVENT_DTYPE.itemsize]
+                if len(payload) > EVENT_DTYPE.itemsize:
+                    args, kwargs = json.loads(payload[EVENT_DTYPE.itemsize:])
+                    objects[len(rows)] = (_to_tuple(args), {k: _to_tuple(v) for k, v in kwargs.items()})
+                rows.append(row)
+            elif kind == cls.SNAPSHOT:
+                snapshot_payload = payload
+            offset = end + cls._CRC.size
+        if offset != len(data):
+            logging.getLogger('client.app').warning(
+                f"{cls.__name__} ignored {len(data) - offset} bytes of torn tail in \"{path}\".")
+        if header is None:
+            raise AppError(f"Журнал сессии \"{path}\" повреждён.")
+
+        return JournalContent(
+            header['name'], _to_tuple(header['task']),
+            np.frombuffer(b''.join(rows), dtype=EVENT_DTYPE),
+            objects,
+            cls._read_snapshot(snapshot_payload) if snapshot_payload is not None else None,
+            offset,
+            header['srepr'],
+        )
+
+    @staticmethod
+    def restore(content: JournalContent, session: TaskSession):
+        """
+        Restores fresh session from the latest snapshot and replays events recorded after it.
+        """
+        state = session.state
+        replayed = 0
+        snapshot = content.snapshot
+        if snapshot is not None:
+            replayed = snapshot.events
+            state.step = snapshot.step
+            state.int_x, state.int_y = snapshot.int_x, snapshot.int_y
+            state.result, state.error = snapshot.result, snapshot.error
+            state.point_buffer = PointBuffer.from_arrays(snapshot.points, snapshot.hits)
+            session.stats.step_time.update(snapshot.step_time)
+        events = EventLog.from_data(content.events, content.objects)
+        for i in range(replayed, len(events)):
+            session.replay(events.action(i), *events.arguments(i))
+        session.stats.events = events
+
@@ -1,40 +1,48 @@
-from typing import Self
+from typing import TYPE_CHECKING, Self, Sequence
+import dataclasses
 import functools
 
 import math
 import time
 
+import numpy as np
+
 from common.task.const import STEP, ACTION, ERROR, ERRORS, Interval, Point
 from common.task.data import TaskState, TaskStats
 from common.task.exceptions import TaskError
 from client.task.Task import Task
-from common import user_math
+from client.task.ActionProfiler import PROFILER
+from common import bounds, user_math
+
+if TYPE_CHECKING:
+    from client.task.TaskJournal import TaskJournal
 
 
 class TaskSession:
-    _RESOLUTION = 10000
 
     dec_accuracy = 3
 
     def __init__(self, task: Task):
         self._task = task
 
-        self._f_min = None
-        self._f_max = None
-        start = self._task.interval[0]
-        dist = self._task.interval[1] - self._task.interval[0]
-        for i in range(self._RESOLUTION + 1):
-            x = start + dist * (i / self._RESOLUTION)
-            y = self.task.f(x)
-            if self._f_min is None or y < self._f_min:
-                self._f_min = y
-            if self._f_max is None or y > self._f_max:
-                self._f_max = y
+        f_range = bounds.FunctionRange(*self._task.artifact(
+            self.bounds_artifact(self.dec_accuracy),
+            lambda: dataclasses.astuple(bounds.find_bounds(self._task.f_expr, self._task.f_array, self._task.interval,
+                                                           self.dec_accuracy)),
+            persist=True
+        ).tolist())
+        self._f_min = f_range.y_min
+        self._f_max = f_range.y_max
 
         self._state = self._create_state()
         self._stats = self._create_stats()
+        self._journal: 'TaskJournal | None' = None
         self.laplace = user_math.LaplaceError(rows=36)
 
+    @staticmethod
+    def bounds_artifact(dec: int) -> str:
+        return f'bounds_{dec}'
+
     def _create_state(self) -> TaskState:
         return TaskState()
 
@@ -61,6 +69,17 @@ class TaskSession:
         """
         return self._stats
 
+    @property
+    def journal(self) -> 'TaskJournal | None':
+        return self._journal
+
+    def set_journal(self, journal: 'TaskJournal | None'):
+        self._journal = journal
+
+    def _checkpoint(self, force: bool = False):
+        if self._journal is not None:
+            self._journal.checkpoint(self._state, self._stats, force)
+
     @property
     def f_min(self):
         return self._f_min
@@ -85,15 +104,19 @@ class TaskSession:
             def wrapper(self: Self, *args, **kwargs):
                 res = func(self, *args, **kwargs)
                 self._record_action(action, args, kwargs)
+                self._checkpoint()
                 self._notify_action(action, args, kwargs)
                 return res
 
+            wrapper.action = action
             return wrapper
 
         return decorator
 
     def _record_action(self, action: ACTION, args: tuple, kwargs: dict):
-        self._stats.append_action(action, args, kwargs)
+        index = self._stats.append_action(action, args, kwargs)
+        if self._journal is not None:
+            self._journal.write_event(self._stats, index)
 
     def _notify_action(self, action: ACTION, args: tuple, kwargs: dict):
         pass
@@ -101,22 +124,33 @@ class TaskSession:
     @staticmethod
     def _check_error(step: STEP | None = None, code: ERROR = ERROR(0)):
         def decorator(func):
+            # Step completion action depends on state, so it is measured by method name.
+            action_name = PROFILER.flag_name(func.action) if hasattr(func, 'action') else func.__name__
+
             @functools.wraps(func)
             def wrapper(self: Self, *args, **kwargs):
+                start = PROFILER.start()
+                kind, name = PROFILER.ACTION, action_name
                 try:
                     if step is not None:
                         self.raise_for_step(step, code)
                     return func(self, *args, **kwargs)
                 except TaskError as error:
-                    self._record_error(error.code, args, kwargs)
+                    if error.code:
+                        kind, name = PROFILER.ERROR, PROFILER.flag_name(error.code)
+                    self._record_error(error.code, args, kwargs, getattr(func, 'action', ACTION(0)))
                     self._notify_error(error.code, args, kwargs)
+                finally:
+                    PROFILER.stop(start, kind, name)
 
             return wrapper
 
         return decorator
 
-    def _record_error(self, error: ERROR, args: tuple, kwargs: dict):
-        self._stats.append_error(error, args, kwargs)  # TODO Resolve zero error.
+    def _record_error(self, error: ERROR, args: tuple, kwargs: dict, action: ACTION = ACTION(0)):
+        index = self._stats.append_error(error, args, kwargs, action)  # TODO Resolve zero error.
+        if self._journal is not None:
+            self._journal.write_event(self._stats, index)
 
     def _notify_error(self, error: ERROR, args: tuple, kwargs: dict):
         if error:
@@ -135,6 +169,7 @@ class TaskSession:
             self._stats.step_time[STEP.END] = time.time()
             self._state.step = STEP.END
             self._record_action(ACTION.END, (), {})
+            self._checkpoint(force=True)
             self._notify_action(ACTION.END, (), {})
 
     @_check_error()
@@ -180,6 +215,7 @@ class TaskSession:
                 self._stats.step_time[nxt] = time.time()
             state.step = nxt
             self._record_action(action, (), {})
+            self._checkpoint(force=True)
             self._notify_action(action, (), {})
 
     @_check_error(STEP.RECT, ERRORS.RECT.WRONG_STEP)
@@ -220,15 +256,13 @@ class TaskSession:
                     self._state.int_y[1]):
                 raise TaskError(ERRORS.POINTS.POINT)
             else:
-                self._state.points.append(tuple(p))
-                self._state.point_counted = False
+                self._state.point_buffer.append(p)
 
     def discard_point(self):
         if self._state.point_counted:
             raise RuntimeError(f"{self}: No uncounted points to discard.")
         else:
-            self._state.points.pop()
-            self._state.point_counted = True
+            self._state.point_buffer.pop()
 
     @_check_error(STEP.POINTS, ERRORS.POINTS.WRONG_STEP)
     @_action(ACTION.COUNT)
@@ -236,7 +270,7 @@ class TaskSession:
         if self._state.point_counted:
             raise TaskError(ERRORS.POINTS.COUNT_BEFORE_GENERATE)
         else:
-            p = self._state.points[-1]
+            p = self._state.points[-1].tolist()
             y_f = self._task.f(p[0])
             hit_real = p[1] <= y_f
             if hit != hit_real:
@@ -245,8 +279,42 @@ class TaskSession:
                                  hit else
                                  ERRORS.POINTS.COUNT_MISS))
             else:
-                self._state.point_hits.append(hit_real)
-                self._state.point_counted = True
+                self._state.point_buffer.count(hit_real)
+
+    @_check_error(STEP.POINTS, ERRORS.POINTS.WRONG_STEP)
+    def count_points(self, points: Sequence[Point] | np.ndarray, hits: Sequence[bool] | np.ndarray) -> list[ERROR]:
+        state = self._state
+        if not state.point_counted:
+            raise TaskError(ERRORS.POINTS.GENERATE_BEFORE_COUNT)
+        ps = np.asarray(points, dtype=float).reshape(-1, 2)
+        claims = np.asarray(hits, dtype=bool).reshape(-1)
+        if len(ps) != len(claims):
+            raise ValueError(f"{self} got {len(ps)} points and {len(claims)} hit claims.")
+
+        xs, ys = ps[:, 0], ps[:, 1]
+        inside = ((state.int_x[0] <= xs) & (xs <= state.int_x[1]) &
+                  (state.int_y[0] <= ys) & (ys <= state.int_y[1]))
+        hits_real = ys <= self._task.f_array(xs)
+
+        codes = []
+        for p, claim, hit_real, is_inside in zip(ps.tolist(), claims.tolist(), hits_real.tolist(), inside.tolist()):
+            p = tuple(p)
+            if not is_inside:
+                code = ERRORS.POINTS.POINT
+                self._record_error(code, (p,), {}, ACTION.GENERATE)
+            else:
+                self._record_action(ACTION.GENERATE, (p,), {})
+                code = ERROR(0)
+                if claim != hit_real:
+                    code = ERRORS.POINTS.COUNT | (ERRORS.POINTS.COUNT_HIT if claim else ERRORS.POINTS.COUNT_MISS)
+                    self._record_error(code, (claim,), {}, ACTION.COUNT)
+                self._record_action(ACTION.COUNT, (hit_real,), {})
+            codes.append(code)
+
+        state.point_buffer.extend(ps[inside], hits_real[inside])
+        self._checkpoint()
+        self._notify_action(ACTION.GENERATE | ACTION.COUNT, (), {})
+        return codes
 
     @_check_error(STEP.INTEGRAL, ERRORS.INTEGRAL.WRONG_STEP)
     @_action(ACTION.RESULT)
@@ -254,7 +322,7 @@ class TaskSession:
         state = self._state
         area = (state.int_x[1] - state.int_x[0]) * (state.int_y[1] - state.int_y[0])
         area_neg = (state.int_x[1] - state.int_x[0]) * max(0.0, -state.int_y[0])
-        res_true = area * (sum(state.point_hits) / len(state.points)) - area_neg
+        res_true = area * state.point_buffer.hit_ratio - area_neg
         if not user_math.compare_meaning(res, res_true, self.dec_accuracy):
             raise TaskError(ERRORS.INTEGRAL.RESULT)
         else:
@@ -264,7 +332,7 @@ class TaskSession:
     @_action(ACTION.ERROR)
     def set_error(self, error: int):
         state = self._state
-        p = sum(state.point_hits) / len(state.points)
+        p = state.point_buffer.hit_ratio
         k = p * (1 - p) / self._task.error ** 2
         a, b = sorted(self.laplace.get_table_inverse(self._task.confidence))
         margin = (math.floor(k / b ** 2), math.ceil(k / a ** 2))
@@ -273,5 +341,28 @@ class TaskSession:
         else:
             state.error = error
 
+    _REPLAY_METHODS = {
+        ACTION.X_0 | ACTION.X_1: 'set_int_x',
+        ACTION.Y_0 | ACTION.Y_1: 'set_int_y',
+        ACTION.GENERATE: 'generate_point',
+        ACTION.COUNT: 'count_point',
+        ACTION.RESULT: 'set_result',
+        ACTION.ERROR: 'set_error',
+        ACTION.END: 'end',
+    }
+
+    def replay(self, action: ACTION, args: tuple = (), kwargs: dict = None):
+        """
+        Repeats recorded action or action attempt, errors are recorded as usual but not raised.
+        Step completion actions discard a pending uncounted point first, as the client does.
+        """
+        method = self._REPLAY_METHODS.get(action, 'next_step')
+        if method == 'next_step' and self.step is STEP.POINTS and not self._state.point_counted:
+            self.discard_point()
+        try:
+            getattr(self, method)(*args, **(kwargs or {}))
+        except TaskError:
+            pass
+
     def __repr__(self):
         return f"{self.__class__.__name__}({self._task}, step={self._state.step})"
@@ -0,0 +1,38 @@
+import dataclasses
+import functools
+
+import numpy as np
+
+from common.bounds import BoundsKey, FunctionRange, bounds_key, eval_array, find_bounds
+from common.task.const import Interval
+
+from client.task.Task import Task
+from client.task.TaskDiskCache import TaskDiskCache
+from client.task.TaskSession import TaskSession
+
+
+def init_worker(cache_root: str | None):
+    """
+    Sets up task disk cache of worker process, which does not run client main.
+    """
+    if cache_root is not None:
+        Task.disk_cache = TaskDiskCache(cache_root)
+
+
+def precompile_task(f: str, interval: Interval, dec: int) -> tuple[BoundsKey, FunctionRange] | None:
+    """
+    Parses task function and finds its bounds, stored in disk cache as the bounds artifact read by TaskSession.
+    :return: Bounds cache key and bounds, None if already stored.
+    """
+    name = TaskSession.bounds_artifact(dec)
+    key = TaskDiskCache.key(f, interval)
+    if Task.disk_cache is not None and name in Task.disk_cache.load(key):
+        return None
+    compiled = Task.compile(f)
+    expr = compiled.expr
+    f_range = find_bounds(expr, functools.partial(eval_array, compiled.f_eval), interval, dec)
+    b_key = bounds_key(expr, interval, dec)
+    if Task.disk_cache is not None:
+        srepr, _, _ = b_key
+        Task.disk_cache.update(key, **{name: np.asarray(dataclasses.astuple(f_range)), 'srepr': np.asarray(srepr)})
+    return b_key, f_range
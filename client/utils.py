@@ -9,10 +9,13 @@ COMMON_STATE.HAS_CLIENT = True
 
 class CONST(COMMON_CONST):
     CLIENT_NAME = COMMON_CONST.BASE_NAME + ' client'
+    PLOT_BACKENDS = ('web', 'native')
 
 
 class STATE(COMMON_STATE):
     DEBUG = COMMON_STATE.DEBUG
+    PLOT_BACKEND = 'web'
+    PROFILE = False
 
 
 class PATH(COMMON_PATH):
@@ -22,3 +25,9 @@ class PATH(COMMON_PATH):
     PLOT = join(LOAD, normpath('gui/plot'))
     PLOTLY_JS = join(PLOT, 'plotly.min.js')
     PLOT_HTML = join(PLOT, 'plot.html')
+
+    RECORDS = join(COMMON_PATH.WRITE, 'records')
+    CACHE = join(COMMON_PATH.WRITE, 'cache')
+    DOWNLOADS = join(COMMON_PATH.WRITE, 'downloads')
+    JOURNAL = join(COMMON_PATH.WRITE, 'session.journal')
+    PROFILE = join(COMMON_PATH.WRITE, 'profile.csv')
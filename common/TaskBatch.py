@@ -1,5 +1,7 @@
+import codecs
 import csv
-from typing import TextIO
+import gzip
+from typing import Iterable, Iterator, NamedTuple, TextIO
 
 from common.exceptions import AppError
 
@@ -10,24 +12,126 @@ TaskBatch = list[BatchTaskTuple]
 
 ERROR_STR = "Строки файла с заданием должны иметь следующий вид:" \
             " \"ФИО,Функция,Начало,Конец,Количество точек,Погрешность,Доверительный интервал\"." \
-            " Синтаксис функций определяется библиотекой sympy (https://www.sympy.org/)." \
-            " Ошибка в строке {n}: \"{row}\"."
-
-
-def read_task_batch(io: TextIO, **kwargs) -> TaskBatch:
-    batch = []
-    reader = csv.reader(io, **kwargs)
-    n = 0
-    row = ''
-    try:
-        for n, row in enumerate(reader):
-            assert len(row) == BatchTaskTupleL
-            name = row[0]
-            f = row[1]
-            start, end = float(row[2]), float(row[3])
-            min_points = int(row[4])
-            error, confidence = float(row[5]), float(row[6])
-            batch.append((name, f, start, end, min_points, error, confidence))
-    except Exception as error:
-        raise AppError(ERROR_STR.format(n=n, row=row)) from error
+            " Синтаксис функций определяется библиотекой sympy (https://www.sympy.org/)."
+ERROR_ROW_STR = "Ошибка в строке {n}: \"{row}\"."
+ERROR_MORE_STR = "И ещё {n} ошибок."
+ERROR_ROWS_SHOWN = 20
+
+
+class BatchRowError(NamedTuple):
+    line: int
+    row: list[str]
+    error: Exception
+
+
+def parse_task_row(row: list[str]) -> BatchTaskTuple:
+    assert len(row) == BatchTaskTupleL
+    name = row[0]
+    f = row[1]
+    start, end = float(row[2]), float(row[3])
+    min_points = int(row[4])
+    error, confidence = float(row[5]), float(row[6])
+    return name, f, start, end, min_points, error, confidence
+
+
+class TaskBatchErrors:
+
+    def __init__(self):
+        self.errors: list[BatchRowError] = []
+
+    def error_str(self) -> str:
+        lines = [ERROR_STR]
+        lines.extend(ERROR_ROW_STR.format(n=e.line, row=e.row) for e in self.errors[:ERROR_ROWS_SHOWN])
+        if len(self.errors) > ERROR_ROWS_SHOWN:
+            lines.append(ERROR_MORE_STR.format(n=len(self.errors) - ERROR_ROWS_SHOWN))
+        return '\n'.join(lines)
+
+    def raise_for_errors(self):
+        if self.errors:
+            raise AppError(self.error_str()) from self.errors[0].error
+
+
+class TaskBatchReader(TaskBatchErrors):
+
+    def __init__(self, io: Iterable[str], **kwargs):
+        super().__init__()
+        self._reader = csv.reader(io, **kwargs)
+
+    def __iter__(self) -> Iterator[BatchTaskTuple]:
+        for row in self._reader:
+            if not row:
+                continue
+            try:
+                yield parse_task_row(row)
+            except Exception as error:
+                self.errors.append(BatchRowError(self._reader.line_num, row, error))
+
+
+class TaskBatchParser(TaskBatchErrors):
+    """
+    Incremental parser of tasks batch arriving in chunks of bytes.
+    Only the last incomplete record is kept between chunks, a record is complete at line end outside of quotes.
+    """
+
+    def __init__(self, encoding: str = 'utf-8', **kwargs):
+        super().__init__()
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._kwargs = kwargs
+        self._quote = kwargs.get('quotechar', '"')
+        self._pending = ''
+        self._line = 0
+
+    def feed(self, data: bytes) -> TaskBatch:
+        """
+        :return: Rows completed by data.
+        """
+        text = self._pending + self._decoder.decode(data)
+        end = 0
+        quoted = False
+        start = 0
+        while (i := text.find('\n', start)) >= 0:
+            quoted ^= text.count(self._quote, start, i) % 2 == 1
+            start = i + 1
+            if not quoted:
+                end = start
+        self._pending = text[end:]
+        return self._parse(text[:end])
+
+    def close(self) -> TaskBatch:
+        """
+        :return: Rows of the last record not terminated by line end.
+        """
+        text = self._pending + self._decoder.decode(b'', final=True)
+        self._pending = ''
+        return self._parse(text)
+
+    def _parse(self, text: str) -> TaskBatch:
+        if not text:
+            return []
+        rows = []
+        reader = csv.reader(text.splitlines(keepends=True), **self._kwargs)
+        for row in reader:
+            if not row:
+                continue
+            try:
+                rows.append(parse_task_row(row))
+            except Exception as error:
+                self.errors.append(BatchRowError(self._line + reader.line_num, row, error))
+        self._line += reader.line_num
+        return rows
+
+
+def open_task_batch(path: str, encoding: str = 'utf-8') -> TextIO:
+    with open(path, mode='rb') as f:
+        compressed = f.read(2) == b'\x1f\x8b'
+    if compressed:
+        return gzip.open(path, mode='rt', encoding=encoding, newline='')
+    else:
+        return open(path, mode='r', encoding=encoding, newline='')
+
+
+def read_task_batch(io: Iterable[str], **kwargs) -> TaskBatch:
+    reader = TaskBatchReader(io, **kwargs)
+    batch = list(reader)
+    reader.raise_for_errors()
     return batch
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import collections
+import dataclasses
+import threading
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+from common.exceptions import AppError
+from common.task.const import Interval
+from common import user_math
+
+if TYPE_CHECKING:
+    import sympy
+
+ArrayFunction = Callable[[np.ndarray], np.ndarray]
+
+
+@dataclasses.dataclass(frozen=True)
+class FunctionRange:
+    y_min: float
+    y_max: float
+    x_min: float
+    x_max: float
+
+
+def eval_array(f: Callable, xs: np.ndarray, f_scalar: Callable[[float], float] | None = None) -> np.ndarray:
+    with np.errstate(all='ignore'):
+        try:
+            ys = np.asarray(f(xs), dtype=float)
+        except (TypeError, ValueError):
+            ys = np.vectorize(f_scalar if f_scalar is not None else f, otypes=[float])(xs)
+    return np.broadcast_to(ys, xs.shape)
+
+
+def scan_range(f: ArrayFunction, xs: np.ndarray, ys: np.ndarray | None = None) -> FunctionRange | None:
+    if ys is None:
+        ys = f(xs)
+    finite = np.isfinite(ys)
+    if not finite.any():
+        return None
+    i_min = int(np.argmin(np.where(finite, ys, np.inf)))
+    i_max = int(np.argmax(np.where(finite, ys, -np.inf)))
+    return FunctionRange(float(ys[i_min]), float(ys[i_max]), float(xs[i_min]), float(xs[i_max]))
+
+
+class BoundsFinder:
+    """
+    Finds function extrema on interval: scans a grid, takes cells around grid minima and derivative sign changes
+    as candidates and refines them with bounded scalar minimization.
+    Grid is refined until bounds of two consecutive resolutions agree to dec + 1 meaningful digits.
+    This stopping rule is a convergence heuristic, not a guaranteed bound:
+    extremum narrower than grid step at every resolution up to MAX_RESOLUTION is missed.
+    """
+    COARSE_RESOLUTION = 256
+    MAX_RESOLUTION = 2 ** 16
+    X_TOLERANCE = 1e-12
+    MAX_CANDIDATES = 16
+
+    def __init__(self, expr: sympy.Expr, f: ArrayFunction, interval: Interval, dec: int):
+        """
+        :param f: Compiled expr, such as Task.f_array, only its derivative is compiled here.
+        """
+        import sympy
+        self._expr = expr
+        self._sym = next(iter(expr.free_symbols)) if expr.free_symbols else sympy.Symbol('x')
+        self._interval = tuple(interval)
+        self._dec = dec
+
+        self._f = f
+        try:
+            self._df = sympy.lambdify(self._sym, sympy.diff(expr, self._sym))
+        except Exception:
+            self._df = None
+        self.evaluations = 0
+
+    def _eval(self, xs: np.ndarray) -> np.ndarray:
+        self.evaluations += xs.size
+        return self._f(xs)
+
+    def _eval_derivative(self, xs: np.ndarray) -> np.ndarray | None:
+        if self._df is None:
+            return None
+        try:
+            return eval_array(self._df, xs, lambda x: float(self._df(x)))
+        except Exception:
+            return None
+
+    def _candidates(self, zs: np.ndarray, dzs: np.ndarray | None) -> np.ndarray:
+        left, mid, right = zs[:-2], zs[1:-1], zs[2:]
+        nodes = np.flatnonzero((mid <= left) & (mid <= right)) + 1
+        cells = [nodes - 1, nodes]
+        if dzs is not None:
+            cells.append(np.flatnonzero((dzs[:-1] < 0) & (dzs[1:] > 0)))
+        cells = np.unique(np.concatenate(cells))
+        order = np.argsort(np.minimum(zs[cells], zs[cells + 1]), kind='stable')
+        return cells[order[:self.MAX_CANDIDATES]]
+
+    def _refine(self, xs: np.ndarray, ys: np.ndarray, dys: np.ndarray | None, sign: int) -> tuple[float, float]:
+        from scipy.optimize import minimize_scalar
+        zs = np.where(np.isfinite(ys), sign * ys, np.inf)
+        i = int(np.argmin(zs))
+        best_x, best_z = float(xs[i]), float(zs[i])
+
+        def objective(x: float) -> float:
+            self.evaluations += 1
+            with np.errstate(all='ignore'):
+                z = sign * float(self._f(np.asarray(x)))
+            return z if np.isfinite(z) else np.inf
+
+        for cell in self._candidates(zs, sign * dys if dys is not None else None):
+            a, b = float(xs[cell]), float(xs[cell + 1])
+            res = minimize_scalar(objective, bounds=(a, b), method='bounded', options=dict(xatol=self.X_TOLERANCE))
+            if np.isfinite(res.fun) and res.fun < best_z:
+                best_x, best_z = float(res.x), float(res.fun)
+        return best_x, sign * best_z
+
+    def _find(self, resolution: int) -> FunctionRange | None:
+        xs = np.linspace(*self._interval, resolution + 1)
+        ys = self._eval(xs)
+        if not np.isfinite(ys).any():
+            return None
+        dys = self._eval_derivative(xs)
+        x_min, y_min = self._refine(xs, ys, dys, 1)
+        x_max, y_max = self._refine(xs, ys, dys, -1)
+        return FunctionRange(y_min, y_max, x_min, x_max)
+
+    def _is_accurate(self, current: FunctionRange, previous: FunctionRange) -> bool:
+        dec = self._dec + 1
+        tolerance = (current.y_max - current.y_min) * 10 ** -dec
+        return all(
+            user_math.compare_meaning(c, p, dec) or abs(c - p) <= tolerance
+            for c, p in ((current.y_min, previous.y_min), (current.y_max, previous.y_max))
+        )
+
+    def find(self) -> FunctionRange:
+        resolution = self.COARSE_RESOLUTION
+        previous = None
+        while True:
+            current = self._find(resolution)
+            if current is None:
+                raise AppError(f"Функция \"{self._expr}\" не определена на интервале {self._interval}.")
+            if previous is not None and self._is_accurate(current, previous) or resolution >= self.MAX_RESOLUTION:
+                return current
+            previous = current
+            resolution *= 4
+
+
+BoundsKey = tuple[str, Interval, int]
+
+BOUNDS_CACHE_SIZE = 1024
+_bounds_cache: collections.OrderedDict[BoundsKey, FunctionRange] = collections.OrderedDict()
+_bounds_lock = threading.Lock()
+
+
+def bounds_key(expr: sympy.Expr, interval: Interval, dec: int) -> BoundsKey:
+    import sympy
+    return sympy.srepr(expr), (float(interval[0]), float(interval[1])), dec
+
+
+def cache_bounds(key: BoundsKey, f_range: FunctionRange):
+    with _bounds_lock:
+        _bounds_cache[key] = f_range
+        _bounds_cache.move_to_end(key)
+        while len(_bounds_cache) > BOUNDS_CACHE_SIZE:
+            _bounds_cache.popitem(last=False)
+
+
+def cached_bounds(key: BoundsKey) -> FunctionRange | None:
+    with _bounds_lock:
+        f_range = _bounds_cache.get(key)
+        if f_range is not None:
+            _bounds_cache.move_to_end(key)
+        return f_range
+
+
+def find_bounds(expr: sympy.Expr, f: ArrayFunction, interval: Interval, dec: int) -> FunctionRange:
+    key = bounds_key(expr, interval, dec)
+    f_range = cached_bounds(key)
+    if f_range is None:
+        f_range = BoundsFinder(expr, f, interval, dec).find()
+        cache_bounds(key, f_range)
+    return f_range
@@ -1,11 +1,91 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 
 from common.utils import CONST, PATH, STATE
 
+FORMAT = '%(levelname)s:%(name)s: %(asctime)s : %(message)s'
+MAX_BYTES = 4 * 2 ** 20
+BACKUP_COUNT = 3
+
 
 class LOG_STATE:
     INIT = False
     LEVEL = None
+    LISTENER: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats record as a single line JSON object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            't': round(record.created, 6),
+            'level': record.levelname,
+            'name': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        if record.stack_info:
+            data['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Passes records to listener thread, doing only message merge and traceback formatting in calling thread.
+    Unlike the base class, record is not formatted, so that listener handlers apply their own formatters.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def create_handlers(path: str, json_lines: bool = False, stream=None) -> list[logging.Handler]:
+    """
+    :return: Console and size-rotated file handlers.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT,
+                                                        encoding='utf-8', delay=True)
+    file_handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter(FORMAT))
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(logging.Formatter(FORMAT))
+    return [stream_handler, file_handler]
+
+
+def start_listener(handlers: list[logging.Handler]) -> tuple[QueueHandler, logging.handlers.QueueListener]:
+    """
+    :return: Handler queueing records and started listener thread passing them to handlers.
+    """
+    q = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(q, *handlers, respect_handler_level=True)
+    listener.start()
+    return QueueHandler(q), listener
+
+
+def stop_logging():
+    """
+    Writes queued records and stops listener thread.
+    """
+    if LOG_STATE.LISTENER is not None:
+        LOG_STATE.LISTENER.stop()
+        LOG_STATE.LISTENER = None
 
 
 def configure_logging():
@@ -13,15 +93,12 @@ def configure_logging():
         logging.getLogger('meta').warning(f"Configuring logging for second time.")
     LOG_STATE.LEVEL = logging.DEBUG if STATE.DEBUG else (logging.INFO if not STATE.FROZEN else logging.WARNING)
 
-    formatter = logging.Formatter('%(levelname)s:%(name)s: %(asctime)s : %(message)s')
-
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
-    file_handler = logging.FileHandler(PATH.get(CONST.BASE_NAME + '.log', mode='WRITE'))
-    file_handler.setFormatter(formatter)
+    # Handlers do blocking I/O, so they run in listener thread and GUI thread only enqueues records.
+    name = CONST.BASE_NAME + ('.jsonl' if STATE.LOG_JSON else '.log')
+    handler, LOG_STATE.LISTENER = start_listener(create_handlers(PATH.get(name, mode='WRITE'), STATE.LOG_JSON))
+    atexit.register(stop_logging)
 
-    logging.getLogger().addHandler(stream_handler)
-    logging.getLogger().addHandler(file_handler)
+    logging.getLogger().addHandler(handler)
 
     logging.getLogger().setLevel(LOG_STATE.LEVEL)
 
@@ -1,7 +1,115 @@
+import collections.abc
 import dataclasses
 import time
+from typing import Sequence
+
+import numpy as np
 
 from common.task.const import STEP, ACTION, ERROR, Interval, Point
+from common.task.events import EventLog
+
+
+class PointBuffer:
+    """
+    Growable array of generated points and hits of counted ones, with maintained hit counter.
+    Points are counted in generation order, so only the last point may be uncounted.
+    """
+    INITIAL_CAPACITY = 64
+
+    def __init__(self):
+        self._points = np.empty((self.INITIAL_CAPACITY, 2), dtype=float)
+        self._hits = np.empty(self.INITIAL_CAPACITY, dtype=bool)
+        self._size = 0
+        self._counted = 0
+        self._hit_count = 0
+
+    @classmethod
+    def from_arrays(cls, points: np.ndarray, hits: np.ndarray) -> 'PointBuffer':
+        buffer = cls()
+        buffer._reserve(len(points))
+        buffer._points[:len(points)] = points
+        buffer._hits[:len(hits)] = hits
+        buffer._size = len(points)
+        buffer._counted = len(hits)
+        buffer._hit_count = int(np.count_nonzero(hits))
+        return buffer
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, size: int):
+        if size > len(self._points):
+            capacity = max(size, 2 * len(self._points))
+            points = np.empty((capacity, 2), dtype=float)
+            points[:self._size] = self._points[:self._size]
+            hits = np.empty(capacity, dtype=bool)
+            hits[:self._counted] = self._hits[:self._counted]
+            self._points, self._hits = points, hits
+
+    @property
+    def points(self) -> np.ndarray:
+        """
+        :return: View of all points, valid until next change.
+        """
+        return self._points[:self._size]
+
+    @property
+    def hits(self) -> np.ndarray:
+        """
+        :return: View of counted points hits, valid until next change.
+        """
+        return self._hits[:self._counted]
+
+    @property
+    def counted(self) -> int:
+        return self._counted
+
+    @property
+    def hit_count(self) -> int:
+        return self._hit_count
+
+    @property
+    def miss_count(self) -> int:
+        return self._counted - self._hit_count
+
+    @property
+    def hit_ratio(self) -> float:
+        return self._hit_count / self._counted
+
+    def append(self, point: Point):
+        self._reserve(self._size + 1)
+        self._points[self._size] = point
+        self._size += 1
+
+    def count(self, hit: bool):
+        if self._counted == self._size:
+            raise IndexError(f"{self.__class__.__name__} has no uncounted points.")
+        self._hits[self._counted] = hit
+        self._counted += 1
+        self._hit_count += bool(hit)
+
+    def extend(self, points: np.ndarray, hits: np.ndarray):
+        """
+        Appends counted points, all present points should be counted.
+        """
+        if self._counted != self._size:
+            raise IndexError(f"{self.__class__.__name__} can not extend after uncounted point.")
+        n = len(points)
+        self._reserve(self._size + n)
+        self._points[self._size:self._size + n] = points
+        self._hits[self._counted:self._counted + n] = hits
+        self._size += n
+        self._counted += n
+        self._hit_count += int(np.count_nonzero(hits))
+
+    def pop(self) -> Point:
+        if not self._size:
+            raise IndexError(f"pop from empty {self.__class__.__name__}.")
+        self._size -= 1
+        if self._counted > self._size:
+            self._counted -= 1
+            self._hit_count -= bool(self._hits[self._counted])
+        return tuple(self._points[self._size].tolist())
 
 
 @dataclasses.dataclass
@@ -9,65 +117,110 @@ class TaskState:
     step = STEP.START
     int_x: Interval | None = None
     int_y: Interval | None = None
-    points: list[Point] = dataclasses.field(default_factory=list)
-    point_hits: list[bool] = dataclasses.field(default_factory=list)
-    point_counted: bool = True
+    point_buffer: PointBuffer = dataclasses.field(default_factory=PointBuffer)
     result: float | None = None
     error: int | None = None
 
+    @property
+    def points(self) -> np.ndarray:
+        return self.point_buffer.points
+
+    @property
+    def point_hits(self) -> np.ndarray:
+        return self.point_buffer.hits
+
+    @property
+    def point_counted(self) -> bool:
+        return self.point_buffer.counted == len(self.point_buffer)
+
+
+class EventSequence(collections.abc.Sequence):
+    """
+    Read-only view of actions or errors of a single step, records are created on access.
+    """
+    __slots__ = ('_stats', '_error', '_step')
+
+    def __init__(self, stats: 'TaskStats', error: bool, step: STEP):
+        self._stats = stats
+        self._error = error
+        self._step = step
+
+    def __len__(self) -> int:
+        return self._stats.events.count(self._error, self._step)
+
+    def __getitem__(self, item: int | slice):
+        indices = self._stats.events.indices(self._error, self._step)[item]
+        if isinstance(item, slice):
+            return [self._stats.event(i) for i in indices]
+        return self._stats.event(int(indices))
+
+    def __iter__(self):
+        for i in self._stats.events.indices(self._error, self._step):
+            yield self._stats.event(int(i))
+
 
 @dataclasses.dataclass
 class TaskStats:
     state: TaskState | None = None
     step_time: dict[STEP, float] = dataclasses.field(default_factory=dict)
 
-    @dataclasses.dataclass
+    events: EventLog = dataclasses.field(default_factory=EventLog)
+
+    @property
+    def records(self) -> int:
+        return len(self.events)
+
+    @dataclasses.dataclass(slots=True)
     class Action:
         action: ACTION
         time: float
         args: tuple
         kwargs: dict
+        index: int
 
-        def __init__(self, action: ACTION, args: tuple = (), kwargs: dict = None):
-            self.action = action
-            self.time = time.time()
-            self.args = args
-            self.kwargs = kwargs if kwargs is not None else {}
+    @property
+    def actions(self) -> dict[STEP, Sequence[Action]]:
+        return {step: EventSequence(self, False, step) for step in self.events.steps(False)}
 
-    actions: dict[STEP, list[Action]] = dataclasses.field(default_factory=dict)
+    def action_count(self, step: STEP | None = None) -> int:
+        return self.events.count(False, step)
 
-    def append_action(self, action: ACTION, args: tuple = (), kwargs: dict = None):
+    def append_action(self, action: ACTION, args: tuple = (), kwargs: dict = None) -> int:
         if self.state is None:
             step = action.step
             raise UserWarning(f"{self} appending action {action} without state set, arguments: {args, kwargs}.")
         else:
             step = self.state.step
-        res = self.Action(action, args, kwargs)
-        self.actions.setdefault(step, []).append(res)
-        return res
+        return self.events.append(step, action, None, args, kwargs if kwargs is not None else {}, time.time())
 
-    @dataclasses.dataclass
+    @dataclasses.dataclass(slots=True)
     class Error:
         code: ERROR
         action: ACTION
         time: float
         args: tuple
         kwargs: dict
+        index: int
 
-        def __init__(self, error: ERROR, args: tuple = (), kwargs: dict = None):
-            self.code = error
-            self.time = time.time()
-            self.args = args
-            self.kwargs = kwargs if kwargs is not None else {}
+    @property
+    def errors(self) -> dict[STEP, Sequence[Error]]:
+        return {step: EventSequence(self, True, step) for step in self.events.steps(True)}
 
-    errors: dict[STEP, list[Error]] = dataclasses.field(default_factory=dict)
+    def error_count(self, step: STEP | None = None) -> int:
+        return self.events.count(True, step)
 
-    def append_error(self, error: ERROR, args: tuple = (), kwargs: dict = None):
+    def append_error(self, error: ERROR, args: tuple = (), kwargs: dict = None, action: ACTION = ACTION(0)) -> int:
         if self.state is None:
             step = error.step
             raise UserWarning(f"{self} appending error {error} without state set, arguments: {args, kwargs}.")
         else:
             step = self.state.step
-        res = self.Error(error, args, kwargs)
-        self.errors.setdefault(step, []).append(res)
-        return res
+        return self.events.append(step, action, error, args, kwargs if kwargs is not None else {}, time.time())
+
+    def event(self, index: int) -> Action | Error:
+        events = self.events
+        args, kwargs = events.arguments(index)
+        error = events.error(index)
+        if error is None:
+            return self.Action(events.action(index), events.time(index), args, kwargs, index)
+        return self.Error(error, events.action(index), events.time(index), args, kwargs, index)
@@ -0,0 +1,137 @@
+import numpy as np
+
+from common.task.const import STEP, ACTION, ERROR
+
+PAYLOAD_SIZE = 2
+
+_FLOAT, _INT, _BOOL = range(3)
+_UNPACK = {_FLOAT: float, _INT: int, _BOOL: bool}
+
+EVENT_DTYPE = np.dtype([
+    ('error', np.bool_),
+    ('step', np.int8),
+    ('action', np.int32),
+    ('code', np.int32),
+    ('time', np.float64),
+    ('n_args', np.int8),
+    ('nested', np.bool_),
+    ('arg_types', np.int8, (PAYLOAD_SIZE,)),
+    ('args', np.float64, (PAYLOAD_SIZE,)),
+])
+
+
+def _pack(args: tuple, kwargs: dict) -> tuple[bool, list[int], list[float]] | None:
+    """
+    Arguments fit numeric payload if they are up to PAYLOAD_SIZE scalars, or a single tuple of them.
+    :return: Whether arguments are a single tuple, types and values of scalars, None if arguments do not fit.
+    """
+    nested = len(args) == 1 and type(args[0]) is tuple
+    values = args[0] if nested else args
+    if kwargs or len(values) > PAYLOAD_SIZE:
+        return None
+    types = []
+    for v in values:
+        if isinstance(v, (bool, np.bool_)):
+            types.append(_BOOL)
+        elif isinstance(v, (int, np.integer)) and abs(v) < 2 ** 53:
+            types.append(_INT)
+        elif isinstance(v, (float, np.floating)):
+            types.append(_FLOAT)
+        else:
+            return None
+    return nested, types, [float(v) for v in values]
+
+
+class EventLog:
+    """
+    Append-only columnar log of session actions and errors, stored in a growable numpy structured array.
+    Arguments that do not fit numeric payload are kept as objects aside.
+    """
+    INITIAL_CAPACITY = 64
+
+    def __init__(self):
+        self._data = np.zeros(self.INITIAL_CAPACITY, dtype=EVENT_DTYPE)
+        self._size = 0
+        self._objects: dict[int, tuple[tuple, dict]] = {}
+        self._counts = ([0] * len(STEP), [0] * len(STEP))
+
+    @classmethod
+    def from_data(cls, data: np.ndarray, objects: dict[int, tuple[tuple, dict]]) -> 'EventLog':
+        """
+        Restores log from previously stored events and their object arguments.
+        """
+        log = cls()
+        log._data = np.zeros(max(cls.INITIAL_CAPACITY, len(data)), dtype=EVENT_DTYPE)
+        log._data[:len(data)] = data
+        log._size = len(data)
+        log._objects = dict(objects)
+        for error in (False, True):
+            steps = data['step'][data['error'] == error]
+            log._counts[error][:] = np.bincount(steps, minlength=len(STEP)).tolist()
+        return log
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        :return: Read-only view of stored events, valid until next append.
+        """
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def append(self, step: STEP, action: ACTION, error: ERROR | None, args: tuple, kwargs: dict,
+               time: float) -> int:
+        if self._size == len(self._data):
+            grown = np.zeros(2 * len(self._data), dtype=EVENT_DTYPE)
+            grown[:self._size] = self._data
+            self._data = grown
+        index = self._size
+        packed = _pack(args, kwargs)
+        if packed is None:
+            self._objects[index] = (args, kwargs)
+            n, nested, types, values = -1, False, [], []
+        else:
+            nested, types, values = packed
+            n = len(values)
+        types += [0] * (PAYLOAD_SIZE - len(types))
+        values += [0.] * (PAYLOAD_SIZE - len(values))
+        self._data[index] = (error is not None, step, action.value, error.value if error is not None else 0, time,
+                             n, nested, types, values)
+        self._counts[error is not None][step] += 1
+        self._size += 1
+        return index
+
+    def count(self, error: bool, step: STEP | None = None) -> int:
+        counts = self._counts[error]
+        return sum(counts) if step is None else counts[step]
+
+    def steps(self, error: bool) -> list[STEP]:
+        return [STEP(s) for s, n in enumerate(self._counts[error]) if n]
+
+    def indices(self, error: bool, step: STEP) -> np.ndarray:
+        data = self._data[:self._size]
+        return np.flatnonzero((data['error'] == error) & (data['step'] == step))
+
+    def step(self, index: int) -> STEP:
+        return STEP(int(self._data[index]['step']))
+
+    def action(self, index: int) -> ACTION:
+        return ACTION(int(self._data[index]['action']))
+
+    def error(self, index: int) -> ERROR | None:
+        row = self._data[index]
+        return ERROR(int(row['code'])) if row['error'] else None
+
+    def time(self, index: int) -> float:
+        return float(self._data[index]['time'])
+
+    def arguments(self, index: int) -> tuple[tuple, dict]:
+        row = self._data[index]
+        n = int(row['n_args'])
+        if n < 0:
+            return self._objects[index]
+        values = tuple(_UNPACK[int(t)](v) for t, v in zip(row['arg_types'][:n], row['args'][:n].tolist()))
+        return ((values,) if row['nested'] else values), {}
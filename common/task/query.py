@@ -0,0 +1,208 @@
+"""
+Vectorized queries over sessions of a columnar store written by common.task.store.
+Depends on numpy only, so that it can be used for analysis without GUI libraries.
+"""
+from typing import Iterable, NamedTuple, Sequence
+
+import numpy as np
+
+from common.exceptions import AppError
+from common.task.const import STEP, ERROR
+from common.task.store import STORE_VERSION, SESSION_TABLE, ERROR_TABLE, chunk_paths
+
+Keys = str | Sequence[str] | None
+
+REDUCE = ('count', 'sum', 'mean', 'min', 'max')
+DURATION_STEPS = (STEP.RECT, STEP.POINTS, STEP.INTEGRAL, STEP.ERROR)
+ERROR_TABLE_SESSION = 'session'
+
+
+class StoreTable(NamedTuple):
+    sessions: dict[str, np.ndarray]
+    errors: dict[str, np.ndarray]
+    action_codes: np.ndarray
+    error_codes: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return len(next(iter(self.sessions.values()), ()))
+
+    def where(self, mask: np.ndarray) -> 'StoreTable':
+        """
+        :param mask: Boolean mask over sessions.
+        :return: Table of selected sessions and their errors.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        errors = self.errors
+        if ERROR_TABLE_SESSION in errors:
+            selected = mask[errors[ERROR_TABLE_SESSION]]
+            errors = {k: v[selected] for k, v in errors.items()}
+            errors[ERROR_TABLE_SESSION] = (np.cumsum(mask) - 1)[errors[ERROR_TABLE_SESSION]]
+        return self._replace(sessions={k: v[mask] for k, v in self.sessions.items()}, errors=errors)
+
+
+class Groups(NamedTuple):
+    keys: tuple[np.ndarray, ...]
+    counts: np.ndarray
+    values: np.ndarray | None
+
+
+def load_store(path: str, columns: Iterable[str] | None = None, error_columns: Iterable[str] | None = ()) -> StoreTable:
+    """
+    Loads and concatenates store chunks, reading only requested columns.
+    :param columns: Session columns, all by default.
+    :param error_columns: Error event columns, none by default.
+    """
+    chunks = chunk_paths(path)
+    if not chunks:
+        raise AppError(f"Хранилище статистики \"{path}\" не найдено или пусто.")
+    tables = {SESSION_TABLE: {}, ERROR_TABLE: {}}
+    wanted = {SESSION_TABLE: None if columns is None else set(columns),
+              ERROR_TABLE: None if error_columns is None else set(error_columns)}
+    if wanted[ERROR_TABLE]:
+        wanted[ERROR_TABLE].add(ERROR_TABLE_SESSION)
+    action_codes = error_codes = None
+    offset = 0
+    for chunk in chunks:
+        with np.load(chunk, allow_pickle=False) as npz:
+            if int(npz['version']) != STORE_VERSION:
+                raise AppError(f"Файл \"{chunk}\" записан неподдерживаемой версией хранилища.")
+            if action_codes is None:
+                action_codes, error_codes = npz['action_codes'], npz['error_codes']
+            elif not (np.array_equal(action_codes, npz['action_codes'])
+                      and np.array_equal(error_codes, npz['error_codes'])):
+                raise AppError(f"Коды действий и ошибок файла \"{chunk}\" не совпадают с остальным хранилищем.")
+            size = 0
+            for key in npz.files:
+                table, _, column = key.partition('/')
+                if table not in tables or (wanted[table] is not None and column not in wanted[table]):
+                    continue
+                values = npz[key]
+                if table == SESSION_TABLE:
+                    size = len(values)
+                elif column == ERROR_TABLE_SESSION:
+                    values = values + offset
+                tables[table].setdefault(column, []).append(values)
+            if not size:
+                size = len(npz[f'{SESSION_TABLE}/events'])
+            offset += size
+    return StoreTable(
+        {k: np.concatenate(v) for k, v in tables[SESSION_TABLE].items()},
+        {k: np.concatenate(v) for k, v in tables[ERROR_TABLE].items()},
+        action_codes, error_codes,
+    )
+
+
+def _group_index(keys: Sequence[np.ndarray], size: int) -> tuple[tuple[np.ndarray, ...], np.ndarray]:
+    if not keys:
+        return (), np.zeros(size, dtype=np.intp)
+    uniques, inverses = zip(*(np.unique(k, return_inverse=True) for k in keys))
+    if len(keys) == 1:
+        return uniques, inverses[0]
+    dims = tuple(map(len, uniques))
+    groups, inverse = np.unique(np.ravel_multi_index(inverses, dims), return_inverse=True)
+    return tuple(u[i] for u, i in zip(uniques, np.unravel_index(groups, dims))), inverse
+
+
+def group_by(keys: Sequence[np.ndarray] | np.ndarray, values: np.ndarray | None = None, reduce: str = 'sum') -> Groups:
+    """
+    Group-by aggregate of rows. Groups are sorted by keys, NaN values are ignored by every reduction except count.
+    :param keys: Key columns, rows with equal keys form a group. No keys form a single group of all rows.
+    :param values: Column or 2d array of columns aggregated per group.
+    :param reduce: One of REDUCE.
+    """
+    if reduce not in REDUCE:
+        raise ValueError(f"Unknown reduction \"{reduce}\", expected one of {REDUCE}.")
+    if isinstance(keys, np.ndarray):
+        keys = (keys,)
+    if not keys and values is None:
+        raise ValueError("Either keys or values are required.")
+    size = len(keys[0]) if keys else len(values)
+    keys, inverse = _group_index(keys, size)
+    counts = np.bincount(inverse, minlength=1 if not keys else len(keys[0]))
+    if values is None or reduce == 'count' or not size:
+        return Groups(keys, counts, None)
+
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    values = np.asarray(values)[order]
+    if values.dtype == np.bool_:
+        values = values.astype(np.int64)
+    if reduce in ('min', 'max'):
+        return Groups(keys, counts, (np.fmin if reduce == 'min' else np.fmax).reduceat(values, starts, axis=0))
+    if np.issubdtype(values.dtype, np.floating):
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0)
+    else:
+        present = None
+    sums = np.add.reduceat(values, starts, axis=0)
+    if reduce == 'sum':
+        return Groups(keys, counts, sums)
+    n = np.add.reduceat(present.astype(np.int64), starts, axis=0) if present is not None else \
+        counts.reshape((-1,) + (1,) * (values.ndim - 1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return Groups(keys, counts, sums / n)
+
+
+def _keys(table: StoreTable, by: Keys) -> list[np.ndarray]:
+    if by is None:
+        return []
+    return [table.sessions[k] for k in ((by,) if isinstance(by, str) else by)]
+
+
+def error_counts(table: StoreTable, by: Keys = None) -> Groups:
+    """
+    :return: Error counts per group of sessions, columns correspond to table.error_codes.
+    """
+    return group_by(_keys(table, by), table.sessions['error_counts'], 'sum')
+
+
+def action_counts(table: StoreTable, by: Keys = None) -> Groups:
+    """
+    :return: Action counts per group of sessions, columns correspond to table.action_codes.
+    """
+    return group_by(_keys(table, by), table.sessions['action_counts'], 'sum')
+
+
+def step_durations(table: StoreTable, by: Keys = None, reduce: str = 'mean') -> Groups:
+    """
+    :return: Time spent on DURATION_STEPS per group of sessions, steps not finished are ignored.
+    """
+    step_time = table.sessions['step_time'][:, DURATION_STEPS[0]:DURATION_STEPS[-1] + 2]
+    return group_by(_keys(table, by), np.diff(step_time, axis=1), reduce)
+
+
+def point_counts(table: StoreTable, by: Keys = None, reduce: str = 'sum') -> Groups:
+    """
+    :return: Generated, counted and hit points per group of sessions.
+    """
+    s = table.sessions
+    return group_by(_keys(table, by), np.stack((s['points'], s['counted'], s['hits']), axis=1), reduce)
+
+
+def error_events(table: StoreTable, by: Sequence[str] = ('step', 'code')) -> Groups:
+    """
+    :return: Number of error events per group of error table columns, requires them to be loaded.
+    """
+    return group_by([table.errors[k] for k in by])
+
+
+def summary(table: StoreTable) -> str:
+    lines = [f"Sessions: {table.size}, complete: {int(np.count_nonzero(table.sessions['complete']))}"]
+    errors = error_counts(table)
+    for code, n in zip(table.error_codes, errors.values[0]):
+        if n:
+            lines.append(f"  {ERROR(int(code)).name}: {n}")
+    durations = step_durations(table)
+    lines.append("Mean step time, s:")
+    for step, t in zip(DURATION_STEPS, durations.values[0]):
+        lines.append(f"  {step.name}: {t:.1f}")
+    points = point_counts(table)
+    lines.append("Points generated, counted, hit: " + ", ".join(map(str, points.values[0])))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import sys
+
+    print(summary(load_store(sys.argv[1])))
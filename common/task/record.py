@@ -0,0 +1,74 @@
+import dataclasses
+import json
+from typing import TextIO
+
+from common.task.const import STEP, ACTION, ERROR
+from common.task.data import TaskStats
+
+RecordTaskTuple = tuple[str, float, float, int, float, float]
+
+
+@dataclasses.dataclass
+class RecordEntry:
+    index: int
+    time: float
+    step: STEP
+    action: ACTION
+    error: ERROR | None
+    args: tuple
+    kwargs: dict
+
+
+@dataclasses.dataclass
+class SessionRecord:
+    name: str | None
+    task: RecordTaskTuple
+    entries: list[RecordEntry]
+
+
+def _to_tuple(value):
+    return tuple(map(_to_tuple, value)) if isinstance(value, list) else value
+
+
+def stats_entries(stats: TaskStats) -> list[RecordEntry]:
+    entries = []
+    for step, actions in stats.actions.items():
+        for a in actions:
+            entries.append(RecordEntry(a.index, a.time, step, a.action, None, a.args, a.kwargs))
+    for step, errors in stats.errors.items():
+        for e in errors:
+            entries.append(RecordEntry(e.index, e.time, step, e.action, e.code, e.args, e.kwargs))
+    entries.sort(key=lambda e: e.index)
+    return entries
+
+
+def write_record(io: TextIO, name: str | None, task: RecordTaskTuple, stats: TaskStats):
+    io.write(json.dumps({'name': name, 'task': list(task)}, ensure_ascii=False))
+    io.write('\n')
+    for e in stats_entries(stats):
+        io.write(json.dumps({
+            'n': e.index,
+            't': e.time,
+            'step': int(e.step),
+            'action': e.action.value,
+            'error': e.error.value if e.error is not None else None,
+            'args': e.args,
+            'kwargs': e.kwargs,
+        }, ensure_ascii=False))
+        io.write('\n')
+
+
+def read_record(io: TextIO) -> SessionRecord:
+    header = json.loads(io.readline())
+    entries = []
+    for line in io:
+        if not line.strip():
+            continue
+        e = json.loads(line)
+        entries.append(RecordEntry(
+            e['n'], e['t'], STEP(e['step']), ACTION(e['action']),
+            ERROR(e['error']) if e['error'] is not None else None,
+            _to_tuple(e['args']), {k: _to_tuple(v) for k, v in e['kwargs'].items()}
+        ))
+    entries.sort(key=lambda e: e.index)
+    return SessionRecord(header.get('name'), _to_tuple(header['task']), entries)
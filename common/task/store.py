@@ -0,0 +1,141 @@
+import os
+import re
+
+import numpy as np
+
+from common.exceptions import AppError
+from common.task.const import STEP, ACTION, ERROR
+from common.task.data import TaskState, TaskStats
+from common.task.record import RecordTaskTuple
+
+STORE_VERSION = 1
+CHUNK_SESSIONS = 4096
+
+ACTION_CODES = np.array([a.value for a in ACTION], dtype=np.int64)
+ERROR_CODES = np.array([e.value for e in ERROR], dtype=np.int64)
+
+SESSION_TABLE, ERROR_TABLE = 'sessions', 'errors'
+
+_CHUNK = re.compile(r'chunk-(\d+)\.npz')
+
+
+def chunk_paths(path: str) -> list[str]:
+    """
+    :return: Chunk files of store directory in writing order.
+    """
+    if not os.path.isdir(path):
+        return []
+    chunks = sorted((int(m[1]), e.path) for e in os.scandir(path) if (m := _CHUNK.fullmatch(e.name)))
+    return [p for _, p in chunks]
+
+
+def _flag_counts(codes: np.ndarray, flags: np.ndarray) -> np.ndarray:
+    """
+    :return: Number of codes containing each of single flags, as codes may combine several.
+    """
+    return np.count_nonzero(codes[:, None].astype(np.int64) & flags, axis=0).astype(np.int32)
+
+
+def session_columns(name: str | None, task: RecordTaskTuple, state: TaskState, stats: TaskStats,
+                    times: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """
+    Single session row of store tables.
+    Step start times are taken from the event log, since completing action of a step is recorded with the next one.
+    :param times: Recorded event times, overrides times of the event log, e.g. of a replayed session.
+    """
+    events = stats.events.data
+    if times is None:
+        times = events['time']
+    steps, first = np.unique(events['step'], return_index=True)
+    step_time = np.full(len(STEP), np.nan)
+    step_time[steps] = times[first]
+
+    error = events['error']
+    buffer = state.point_buffer
+    f, start, end, min_points, error_value, confidence = task
+    return {
+        f'{SESSION_TABLE}/name': np.array([name or '']),
+        f'{SESSION_TABLE}/task_f': np.array([f]),
+        f'{SESSION_TABLE}/task_start': np.array([start], dtype=np.float64),
+        f'{SESSION_TABLE}/task_end': np.array([end], dtype=np.float64),
+        f'{SESSION_TABLE}/task_points': np.array([min_points], dtype=np.int64),
+        f'{SESSION_TABLE}/task_error': np.array([error_value], dtype=np.float64),
+        f'{SESSION_TABLE}/task_confidence': np.array([confidence], dtype=np.float64),
+        f'{SESSION_TABLE}/step': np.array([state.step], dtype=np.int8),
+        f'{SESSION_TABLE}/complete': np.array([state.step is STEP.END]),
+        f'{SESSION_TABLE}/step_time': step_time[None],
+        f'{SESSION_TABLE}/events': np.array([len(events)], dtype=np.int64),
+        f'{SESSION_TABLE}/points': np.array([len(buffer)], dtype=np.int64),
+        f'{SESSION_TABLE}/counted': np.array([buffer.counted], dtype=np.int64),
+        f'{SESSION_TABLE}/hits': np.array([buffer.hit_count], dtype=np.int64),
+        f'{SESSION_TABLE}/result': np.array([np.nan if state.result is None else state.result]),
+        f'{SESSION_TABLE}/error': np.array([np.nan if state.error is None else state.error]),
+        f'{SESSION_TABLE}/action_counts': _flag_counts(events['action'][~error], ACTION_CODES)[None],
+        f'{SESSION_TABLE}/error_counts': _flag_counts(events['code'][error], ERROR_CODES)[None],
+        f'{ERROR_TABLE}/session': np.zeros(np.count_nonzero(error), dtype=np.int64),
+        f'{ERROR_TABLE}/step': events['step'][error],
+        f'{ERROR_TABLE}/action': events['action'][error],
+        f'{ERROR_TABLE}/code': events['code'][error],
+        f'{ERROR_TABLE}/time': times[error],
+    }
+
+
+class StatsStoreWriter:
+    """
+    Appends finished sessions to a columnar store, a directory of .npz chunks with one array per column.
+    Sessions are buffered and written as a new chunk every CHUNK_SESSIONS sessions and on close.
+    """
+
+    def __init__(self, path: str, chunk_sessions: int = CHUNK_SESSIONS, compress: bool = False):
+        self._path = path
+        self._chunk_sessions = chunk_sessions
+        self._compress = compress
+        self._rows: list[dict[str, np.ndarray]] = []
+        chunks = chunk_paths(path)
+        self._chunk = int(_CHUNK.fullmatch(os.path.basename(chunks[-1]))[1]) + 1 if chunks else 0
+
+    def __enter__(self) -> 'StatsStoreWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def append(self, name: str | None, task: RecordTaskTuple, state: TaskState, stats: TaskStats,
+               times: np.ndarray | None = None):
+        self.append_columns(session_columns(name, task, state, stats, times))
+
+    def append_columns(self, columns: dict[str, np.ndarray]):
+        """
+        :param columns: Session row created by session_columns.
+        """
+        self._rows.append(columns)
+        if len(self._rows) >= self._chunk_sessions:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        columns = {k: np.concatenate([r[k] for r in rows]) for k in rows[0]}
+        columns[f'{ERROR_TABLE}/session'] = np.repeat(np.arange(len(rows), dtype=np.int64),
+                                                      [len(r[f'{ERROR_TABLE}/session']) for r in rows])
+        columns['version'] = np.array(STORE_VERSION)
+        columns['action_codes'] = ACTION_CODES
+        columns['error_codes'] = ERROR_CODES
+
+        os.makedirs(self._path, exist_ok=True)
+        path = os.path.join(self._path, f'chunk-{self._chunk:06d}.npz')
+        try:
+            with open(path + '.tmp', mode='wb') as f:
+                (np.savez_compressed if self._compress else np.savez)(f, **columns)
+            os.replace(path + '.tmp', path)
+        except OSError as error:
+            raise AppError(f"Не удалось записать файл \"{path}\".") from error
+        self._chunk += 1
+
+    def close(self):
+        self.flush()
@@ -1,7 +1,6 @@
 import math
 
 import numpy as np
-from scipy.special import erf, erfinv
 
 
 def meaning_power(x: float):
@@ -27,6 +26,7 @@ def compare_meaning(x: float, y: float, dec: int, frac_only: bool = True):
 
 
 class LaplaceError:
+    _TABLES: dict[tuple[int, int, float, float], tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
 
     def __init__(self, rows=40, cols=10, step_y=0.1, step_x=0.01):
         self.rows = rows
@@ -36,10 +36,12 @@ class LaplaceError:
 
     @staticmethod
     def get_error(key: float):
+        from scipy.special import erf
         return erf(key / 2 ** .5) / 2
 
     @staticmethod
     def get_inverse(error: float):
+        from scipy.special import erfinv
         return 2 ** .5 * erfinv(2 * error)
 
     def get_args_y(self):
@@ -48,16 +50,39 @@ class LaplaceError:
     def get_args_x(self):
         return np.arange(0, self.step_x * self.cols, self.step_x)
 
+    def _get_tables(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: Table, its values sorted and table keys in the same order, shared between equally configured instances.
+        """
+        config = (self.rows, self.cols, self.step_y, self.step_x)
+        tables = self._TABLES.get(config)
+        if tables is None:
+            x, y = np.meshgrid(self.get_args_x(), self.get_args_y())
+            table = self.get_error(x + y)
+            order = np.argsort(table, axis=None, kind='stable')
+            values = table.ravel()[order]
+            keys = (y + x).ravel()[order]
+            tables = (table, values, keys)
+            for t in tables:
+                t.flags.writeable = False
+            self._TABLES[config] = tables
+        return tables
+
     def get_table(self):
-        x, y = np.meshgrid(self.get_args_x(), self.get_args_y())
-        return self.get_error(x + y)
+        return self._get_tables()[0]
 
     def get_table_error(self, key: float):
         raise NotImplementedError()
 
+    def get_table_inverse_many(self, errors, n: int = 2) -> np.ndarray:
+        _, values, keys = self._get_tables()
+        errors = np.asarray(errors, dtype=float).reshape(-1)
+        n = min(n, values.size)
+        window = min(2 * n, values.size)
+        start = np.clip(np.searchsorted(values, errors) - n, 0, values.size - window)
+        candidates = start[:, np.newaxis] + np.arange(window)
+        nearest = np.argsort(np.abs(values[candidates] - errors[:, np.newaxis]), axis=1, kind='stable')[:, :n]
+        return keys[np.take_along_axis(candidates, nearest, axis=1)]
+
     def get_table_inverse(self, error: float, n: int = 2):
-        t = self.get_table()
-        vs = np.argpartition(np.abs(t - error), n, axis=None)
-        ys, xs = np.unravel_index(vs[:n], t.shape)
-        y_args, x_args = self.get_args_y(), self.get_args_x()
-        return y_args[ys] + x_args[xs]
+        return self.get_table_inverse_many((error,), n)[0]
@@ -34,6 +34,7 @@ class STATE(_Const):
     HAS_SERVER = False
 
     DEBUG = False
+    LOG_JSON = False
 
 
 class PATH(_Const):